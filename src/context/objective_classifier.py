@@ -45,7 +45,16 @@ class ObjectiveClassifier:
     # Mapeamento inverso de IDs para objetivos
     OBJECTIVE_ID_MAPPING = {v: k for k, v in OBJECTIVE_MAPPING.items()}
     
-    def __init__(self, api_key: Optional[str] = None, confidence_threshold: float = 0.75, use_fallback: bool = True):
+    # Padrões que identificam o objetivo diretamente, sem chamadas à API,
+    # com a confiança atribuída quando apenas um objetivo é reconhecido
+    DIRECT_PATTERNS = (
+        (re.compile(r"\b(?:hip[óo]tese|confirma|é verdade)\b", re.IGNORECASE), OBJECTIVE_VALIDATE, 0.9),
+        (re.compile(r"\b(?:insights?|padr[õo]es|o que .* dizem)\b", re.IGNORECASE), OBJECTIVE_INSIGHT, 0.9),
+        (re.compile(r"\b(?:quais (?:são|foram)|o que (?:descobrimos|sabemos)|que informa[çc][õo]es)\b", re.IGNORECASE), OBJECTIVE_EXPLORE, 0.85)
+    )
+    
+    def __init__(self, api_key: Optional[str] = None, confidence_threshold: float = 0.75, use_fallback: bool = True,
+                 use_direct_patterns: bool = True):
         """
         Inicializa o classificador de objetivos.
         
@@ -53,6 +62,8 @@ class ObjectiveClassifier:
             api_key: Chave da API OpenAI (opcional, usa variável de ambiente se não fornecida)
             confidence_threshold: Limiar de confiança para aceitação automática (0.0 a 1.0)
             use_fallback: Se True, usa o classificador local em caso de falha da API OpenAI
+            use_direct_patterns: Se True, classifica pelos padrões diretos (DIRECT_PATTERNS),
+                sem chamar a API, as perguntas em que apenas um objetivo é reconhecido
         """
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
         if not self.api_key:
@@ -60,6 +71,7 @@ class ObjectiveClassifier:
             
         self.confidence_threshold = confidence_threshold
         self.use_fallback = use_fallback
+        self.use_direct_patterns = use_direct_patterns
         self.examples = self._load_examples()
         self.client = None
         self.example_embeddings = None
@@ -293,10 +305,34 @@ class ObjectiveClassifier:
         
         return best_objective, confidence, normalized_scores
     
+    def _classify_with_patterns(self, question: str) -> Optional[Tuple[str, float, Dict[str, float]]]:
+        """
+        Classifica uma pergunta pelos padrões diretos, quando apenas um objetivo é reconhecido.
+        
+        Args:
+            question: Texto da pergunta do usuário
+            
+        Returns:
+            Tupla com (objetivo_identificado, nível_de_confiança, scores_por_objetivo)
+            ou None se nenhum ou mais de um objetivo for reconhecido
+        """
+        matches = [(objective, confidence) for pattern, objective, confidence in self.DIRECT_PATTERNS if pattern.search(question)]
+        if len(matches) != 1:
+            return None
+            
+        best_objective, confidence = matches[0]
+        other_score = (1.0 - confidence) / (len(self.OBJECTIVE_MAPPING) - 1)
+        scores = {objective: confidence if objective == best_objective else other_score for objective in self.OBJECTIVE_MAPPING}
+        
+        logger.info(f"Pergunta classificada por padrão direto como '{best_objective}' com confiança {confidence:.4f}")
+        
+        return best_objective, confidence, scores
+    
     def classify_question(self, question: str) -> Tuple[str, float, Dict[str, float]]:
         """
         Classifica uma pergunta para identificar o objetivo implícito.
-        Tenta usar embeddings primeiro, com fallback para classificação baseada em palavras-chave.
+        Usa os padrões diretos (se habilitados) quando a pergunta não é ambígua; caso contrário,
+        tenta usar embeddings, com fallback para classificação baseada em palavras-chave.
         
         Args:
             question: Texto da pergunta do usuário
@@ -304,6 +340,11 @@ class ObjectiveClassifier:
         Returns:
             Tupla com (objetivo_identificado, nível_de_confiança, scores_por_objetivo)
         """
+        if self.use_direct_patterns:
+            direct = self._classify_with_patterns(question)
+            if direct is not None:
+                return direct
+            
         try:
             # Tentar classificar com embeddings primeiro
             if self.client and self.example_embeddings:
@@ -9,9 +9,17 @@ import os
 import logging
 import json
 import uuid
+import hashlib
+import time
+import queue
+import atexit
+import threading
 from pathlib import Path
+from urllib.parse import urlparse
 import weaviate
-from weaviate.auth import AuthApiKey
+from weaviate.classes.init import AdditionalConfig, Auth, Timeout
+from weaviate.classes.query import Filter
+from src.utils.openai_safe import create_safe_openai_client
 
 # Configuração de logging
 logging.basicConfig(
@@ -20,10 +28,305 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Timeouts (conexão inicial, consultas, inserções) das requisições ao Weaviate, em segundos
+WEAVIATE_TIMEOUT = Timeout(init=30, query=60, insert=120)
+
+# Intervalo mínimo (em segundos) entre verificações de disponibilidade de um cliente compartilhado
+CLIENT_READY_CHECK_INTERVAL = 30
+
+# Clientes Weaviate compartilhados pelo processo (aplicação, API e scripts),
+# com o instante da última verificação de disponibilidade de cada um
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+# Clientes substituídos por não responderem; só são fechados ao final do
+# processo, pois outra thread pode estar no meio de uma consulta com eles
+_retired_clients = []
+
+# Modelo e lotes usados para gerar os embeddings no cliente
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = 128
+EMBEDDING_MAX_CHARS = 8000
+
+# Threads que preparam (embeddings, propriedades e UUIDs) os trechos da ingestão em lote
+INGEST_PRODUCER_THREADS = 4
+
+# Quantidade máxima de IDs consultados por requisição na verificação de existência
+EXISTENCE_PROBE_SIZE = 1000
+
+# Peso da busca vetorial na busca híbrida (1 = só vetorial, 0 = só BM25)
+HYBRID_ALPHA = 0.7
+
+# Propriedades consultadas pelo BM25 na busca híbrida, com o conteúdo em dobro
+HYBRID_QUERY_PROPERTIES = ["content^2", "filename"]
+
+# Propriedades leves retornadas por padrão nas buscas; o conteúdo é obtido sob demanda
+SEARCH_METADATA_PROPERTIES = ["tipo", "filename", "file_path"]
+
+# Hash SHA-1 já alimentado com o namespace dos UUIDs determinísticos dos documentos
+_UUID_NAMESPACE_HASH = hashlib.sha1(uuid.NAMESPACE_DNS.bytes)
+
+# Propriedades padrão da classe de documentos
+DEFAULT_PROPERTIES = [
+    {
+        "name": "content",
+        "dataType": ["text"],
+        "description": "Conteúdo textual do documento"
+    },
+    {
+        "name": "tipo",
+        "dataType": ["text"],
+        "description": "Tipo de documento (ex: discovery, entrevista, pesquisa)"
+    },
+    {
+        "name": "autor",
+        "dataType": ["text"],
+        "description": "Autor do documento"
+    },
+    {
+        "name": "projeto",
+        "dataType": ["text"],
+        "description": "Projeto relacionado ao documento"
+    },
+    {
+        "name": "data",
+        "dataType": ["date"],
+        "description": "Data de criação do documento"
+    },
+    {
+        "name": "fonte",
+        "dataType": ["text"],
+        "description": "Fonte do documento"
+    },
+    {
+        "name": "nivel_confidencialidade",
+        "dataType": ["text"],
+        "description": "Nível de confidencialidade do documento"
+    },
+    {
+        "name": "filename",
+        "dataType": ["text"],
+        "description": "Nome do arquivo original"
+    },
+    {
+        "name": "file_path",
+        "dataType": ["text"],
+        "description": "Caminho do arquivo original"
+    }
+]
+
+# Origem de cada propriedade nos metadados do documento: (chave, valor padrão)
+_PROPERTY_SOURCES = {
+    "tipo": ("tipo", "documento"),
+    "filename": ("filename", ""),
+    "file_path": ("path", "")
+}
+
+def make_properties_builder(properties):
+    """
+    Cria a função que monta as propriedades de um documento para o esquema.
+    
+    As propriedades do esquema com origem nos metadados (_PROPERTY_SOURCES) são
+    resolvidas uma única vez aqui; os demais metadados do documento são
+    repassados como estão.
+    
+    Args:
+        properties (list): Propriedades do esquema da classe
+        
+    Returns:
+        callable: Função (text, metadata) -> dict de propriedades
+    """
+    schema_names = {prop["name"] for prop in properties}
+    sources = [(name, key, default) for name, (key, default) in _PROPERTY_SOURCES.items() if name in schema_names]
+    source_keys = frozenset(key for _, key, _ in sources)
+    
+    def build_properties(text, metadata):
+        built = {"content": text}
+        for name, key, default in sources:
+            built[name] = metadata.get(key, default)
+        
+        # Adicionar outros metadados disponíveis
+        for key, value in metadata.items():
+            if key not in source_keys:
+                built[key] = value
+        
+        return built
+    
+    return build_properties
+
+def embed_texts(openai_client, texts):
+    """
+    Gera embeddings com EMBEDDING_MODEL, em lotes de EMBEDDING_BATCH_SIZE textos por chamada.
+    
+    Usada na indexação e nas consultas, para que os vetores das consultas
+    estejam no mesmo espaço dos vetores dos documentos.
+    
+    Args:
+        openai_client (OpenAI): Cliente OpenAI usado nas chamadas
+        texts (list): Textos a serem vetorizados
+        
+    Returns:
+        list: Um vetor por texto, na mesma ordem da entrada
+    """
+    vectors = []
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        response = openai_client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            # A API rejeita entradas vazias
+            input=[text[:EMBEDDING_MAX_CHARS] or " " for text in texts[start:start + EMBEDDING_BATCH_SIZE]]
+        )
+        vectors.extend(item.embedding for item in response.data)
+    
+    return vectors
+
+def connect_weaviate(url, api_key=None):
+    """
+    Abre uma conexão com o Weaviate (HTTP para o schema, gRPC para buscas e lotes).
+    
+    Clusters do Weaviate Cloud usam connect_to_weaviate_cloud, que resolve o
+    host gRPC próprio do cluster; as demais URLs (Weaviate local ou
+    auto-hospedado) usam connect_to_custom, com o gRPC na porta 50051 do
+    mesmo host.
+    
+    Args:
+        url (str): URL do endpoint REST Weaviate
+        api_key (str, optional): Chave de API para acesso ao Weaviate
+        
+    Returns:
+        weaviate.WeaviateClient: Cliente Weaviate (a disponibilidade não é verificada)
+    """
+    additional_config = AdditionalConfig(timeout=WEAVIATE_TIMEOUT)
+    
+    # Configurar autenticação
+    auth_config = None
+    if api_key:
+        auth_config = Auth.api_key(api_key)
+    
+    parsed_url = urlparse(url if "://" in url else f"https://{url}")
+    
+    if parsed_url.hostname.endswith((".weaviate.cloud", ".weaviate.network")):
+        return weaviate.connect_to_weaviate_cloud(
+            cluster_url=url,
+            auth_credentials=auth_config,
+            additional_config=additional_config
+        )
+    
+    secure = parsed_url.scheme == "https"
+    return weaviate.connect_to_custom(
+        http_host=parsed_url.hostname,
+        http_port=parsed_url.port or (443 if secure else 80),
+        http_secure=secure,
+        grpc_host=parsed_url.hostname,
+        grpc_port=50051,
+        grpc_secure=secure,
+        auth_credentials=auth_config,
+        additional_config=additional_config
+    )
+
+def get_shared_client(url, api_key=None):
+    """
+    Retorna o cliente Weaviate compartilhado pelo processo para estas credenciais.
+    
+    A conexão (TLS e canal gRPC) é aberta uma única vez e reutilizada por todas
+    as sessões do Streamlit, pelo WeaviateClient e pelos scripts de
+    manutenção; só é refeita se deixar de responder. A disponibilidade é
+    verificada no máximo a cada CLIENT_READY_CHECK_INTERVAL segundos, evitando
+    uma requisição extra por consulta.
+    
+    Args:
+        url (str): URL do endpoint REST Weaviate
+        api_key (str, optional): Chave de API para acesso ao Weaviate
+        
+    Returns:
+        weaviate.WeaviateClient: Cliente Weaviate conectado ou None em caso de erro
+    """
+    key = (url, api_key)
+    with _shared_clients_lock:
+        now = time.monotonic()
+        entry = _shared_clients.get(key)
+        if entry is not None:
+            client, checked_at = entry
+            if now - checked_at < CLIENT_READY_CHECK_INTERVAL:
+                return client
+            try:
+                if client.is_ready():
+                    entry[1] = now
+                    return client
+            except Exception as e:
+                logger.warning(f"Conexão compartilhada com Weaviate indisponível: {e}")
+            _retired_clients.append(client)
+            del _shared_clients[key]
+        
+        try:
+            client = connect_weaviate(url, api_key)
+            
+            # Verificar conexão
+            if not client.is_ready():
+                logger.error(f"Falha ao conectar com Weaviate: {url}")
+                client.close()
+                return None
+            
+        except Exception as e:
+            logger.error(f"Erro ao conectar com Weaviate: {e}")
+            return None
+        
+        logger.info(f"Conexão estabelecida com Weaviate: {url}")
+        _shared_clients[key] = [client, now]
+        return client
+
+def invalidate_shared_client(url, api_key=None):
+    """
+    Força a verificação de disponibilidade do cliente compartilhado na próxima
+    chamada a get_shared_client, sem fechá-lo.
+    
+    Args:
+        url (str): URL do endpoint REST Weaviate
+        api_key (str, optional): Chave de API para acesso ao Weaviate
+    """
+    with _shared_clients_lock:
+        entry = _shared_clients.get((url, api_key))
+        if entry is not None:
+            entry[1] = float('-inf')
+
+@atexit.register
+def close_shared_clients():
+    """Encerra as conexões compartilhadas com o Weaviate."""
+    with _shared_clients_lock:
+        clients = [client for client, _ in _shared_clients.values()] + _retired_clients
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Erro ao encerrar conexão com Weaviate: {e}")
+        _shared_clients.clear()
+        _retired_clients.clear()
+
+def content_uuid(text):
+    """
+    Gera o UUID determinístico de um documento a partir do início do seu texto.
+    
+    Equivale a str(uuid.uuid5(uuid.NAMESPACE_DNS, text[:1000])), mas formata o
+    hash diretamente, sem criar objetos UUID intermediários.
+    
+    Args:
+        text (str): Texto do documento
+        
+    Returns:
+        str: UUID canônico (36 caracteres)
+    """
+    # Partir do hash do namespace evita concatenar (e copiar) o prefixo codificado
+    sha = _UUID_NAMESPACE_HASH.copy()
+    sha.update(text[:1000].encode('utf-8'))
+    digest = bytearray(sha.digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50  # versão 5
+    digest[8] = (digest[8] & 0x3F) | 0x80  # variante RFC 4122
+    hex_digest = digest.hex()
+    return f"{hex_digest[:8]}-{hex_digest[8:12]}-{hex_digest[12:16]}-{hex_digest[16:20]}-{hex_digest[20:]}"
+
 class WeaviateClient:
     """Cliente para interagir com a base vetorial Weaviate."""
     
-    def __init__(self, url, api_key=None, read_only_api_key=None):
+    def __init__(self, url, api_key=None, read_only_api_key=None, openai_api_key=None):
         """
         Inicializa o cliente Weaviate.
         
@@ -31,44 +334,47 @@ class WeaviateClient:
             url (str): URL do endpoint REST Weaviate
             api_key (str, optional): Chave de API para acesso administrativo
             read_only_api_key (str, optional): Chave de API para acesso somente leitura
+            openai_api_key (str, optional): Chave da API OpenAI usada nos embeddings
         """
         self.url = url
         self.api_key = api_key
         self.read_only_api_key = read_only_api_key
+        self.openai_api_key = openai_api_key
+        self.openai_client = None
         self.client = None
+        self._build_properties = make_properties_builder(DEFAULT_PROPERTIES)
         self.connect()
     
     def connect(self):
-        """Estabelece conexão com o Weaviate."""
-        try:
-            # Configurar autenticação
-            auth_config = None
-            if self.api_key:
-                auth_config = AuthApiKey(api_key=self.api_key)
-            
-            # Conectar ao Weaviate usando a API v4
-            self.client = weaviate.WeaviateClient(
-                connection_params=weaviate.ConnectionParams.from_url(
-                    url=self.url,
-                    auth_credentials=auth_config
-                )
-            )
-            
-            # Verificar conexão
-            if self.client.is_ready():
-                logger.info(f"Conexão estabelecida com Weaviate: {self.url}")
-            else:
-                logger.error(f"Falha ao conectar com Weaviate: {self.url}")
-                self.client = None
-                
-        except Exception as e:
-            logger.error(f"Erro ao conectar com Weaviate: {e}")
-            self.client = None
+        """Obtém a conexão compartilhada com o Weaviate (HTTP para o schema, gRPC para buscas e lotes)."""
+        self.client = get_shared_client(self.url, self.api_key)
     
     def is_connected(self):
         """Verifica se o cliente está conectado ao Weaviate."""
         return self.client is not None and self.client.is_ready()
     
+    def close(self):
+        """
+        Libera o cliente. A conexão é compartilhada pelo processo e só é
+        encerrada ao final dele (ver close_shared_clients).
+        """
+        self.client = None
+    
+    def embed_texts(self, texts):
+        """
+        Gera embeddings no cliente, em lotes de EMBEDDING_BATCH_SIZE textos por chamada.
+        
+        Args:
+            texts (list): Textos a serem vetorizados
+            
+        Returns:
+            list: Um vetor por texto, na mesma ordem da entrada
+        """
+        if self.openai_client is None:
+            self.openai_client = create_safe_openai_client(api_key=self.openai_api_key)
+        
+        return embed_texts(self.openai_client, texts)
+    
     def create_schema(self, class_name="Document", properties=None):
         """
         Cria o esquema para a classe de documentos no Weaviate.
@@ -84,62 +390,16 @@ class WeaviateClient:
             logger.error("Cliente não está conectado ao Weaviate")
             return False
         
-        # Definir propriedades padrão se não forem fornecidas
+        # Usar as propriedades padrão se não forem fornecidas
         if properties is None:
-            properties = [
-                {
-                    "name": "content",
-                    "dataType": ["text"],
-                    "description": "Conteúdo textual do documento"
-                },
-                {
-                    "name": "tipo",
-                    "dataType": ["text"],
-                    "description": "Tipo de documento (ex: discovery, entrevista, pesquisa)"
-                },
-                {
-                    "name": "autor",
-                    "dataType": ["text"],
-                    "description": "Autor do documento"
-                },
-                {
-                    "name": "projeto",
-                    "dataType": ["text"],
-                    "description": "Projeto relacionado ao documento"
-                },
-                {
-                    "name": "data",
-                    "dataType": ["date"],
-                    "description": "Data de criação do documento"
-                },
-                {
-                    "name": "fonte",
-                    "dataType": ["text"],
-                    "description": "Fonte do documento"
-                },
-                {
-                    "name": "nivel_confidencialidade",
-                    "dataType": ["text"],
-                    "description": "Nível de confidencialidade do documento"
-                },
-                {
-                    "name": "filename",
-                    "dataType": ["text"],
-                    "description": "Nome do arquivo original"
-                },
-                {
-                    "name": "file_path",
-                    "dataType": ["text"],
-                    "description": "Caminho do arquivo original"
-                }
-            ]
+            properties = DEFAULT_PROPERTIES
         
         try:
-            # Verificar se a classe já existe
-            schema = self.client.schema.get()
-            classes = [c['class'] for c in schema['classes']] if 'classes' in schema else []
+            # Montar as propriedades dos documentos de acordo com o esquema da classe
+            self._build_properties = make_properties_builder(properties)
             
-            if class_name in classes:
+            # Verificar se a classe já existe
+            if self.client.collections.exists(class_name):
                 logger.info(f"Classe '{class_name}' já existe no Weaviate")
                 return True
             
@@ -147,19 +407,13 @@ class WeaviateClient:
             class_obj = {
                 "class": class_name,
                 "description": "Documentos para o agente de IA de ideação e discovery de produto",
-                "vectorizer": "text2vec-openai",
-                "moduleConfig": {
-                    "text2vec-openai": {
-                        "model": "ada",
-                        "modelVersion": "002",
-                        "type": "text"
-                    }
-                },
+                # Os vetores são gerados no cliente (ver embed_texts)
+                "vectorizer": "none",
                 "properties": properties
             }
             
             # Criar a classe
-            self.client.schema.create_class(class_obj)
+            self.client.collections.create_from_dict(class_obj)
             
             logger.info(f"Classe '{class_name}' criada com sucesso no Weaviate")
             return True
@@ -189,23 +443,16 @@ class WeaviateClient:
             metadata = document.get('metadata', {})
             
             # Preparar propriedades para o Weaviate
-            properties = {
-                "content": text,
-                "tipo": metadata.get('tipo', 'documento'),
-                "filename": metadata.get('filename', ''),
-                "file_path": metadata.get('path', '')
-            }
-            
-            # Adicionar outros metadados disponíveis
-            for key, value in metadata.items():
-                if key not in ['tipo', 'filename', 'path']:
-                    properties[key] = value
+            properties = self._build_properties(text, metadata)
             
             # Gerar UUID baseado no conteúdo para evitar duplicatas
-            doc_uuid = str(uuid.uuid5(uuid.NAMESPACE_DNS, text[:1000]))
+            doc_uuid = content_uuid(text)
+            
+            # Gerar o embedding no cliente
+            vector = self.embed_texts([text])[0]
             
             # Adicionar documento ao Weaviate usando a API v4
-            self.client.data.creator().with_class_name(class_name).with_id(doc_uuid).with_properties(properties).do()
+            self.client.collections.get(class_name).data.insert(properties=properties, uuid=doc_uuid, vector=vector)
             
             logger.info(f"Documento adicionado ao Weaviate com ID: {doc_uuid}")
             return doc_uuid
@@ -214,10 +461,72 @@ class WeaviateClient:
             logger.error(f"Erro ao adicionar documento ao Weaviate: {e}")
             return None
     
+    def _filter_new_documents(self, collection, documents):
+        """
+        Remove duplicatas do próprio lote e documentos que já estão no Weaviate.
+        
+        Args:
+            collection: Coleção do Weaviate que receberá os documentos
+            documents (list): Documentos candidatos à indexação
+            
+        Returns:
+            list: Pares (uuid, documento) ainda não indexados, sem repetição de conteúdo
+        """
+        # Deduplicar em memória pelo UUID derivado do conteúdo
+        unique = {}
+        for document in documents:
+            unique.setdefault(content_uuid(document.get('text', '')), document)
+        
+        # Consultar em bloco quais UUIDs já existem na coleção
+        candidate_ids = list(unique)
+        existing_ids = set()
+        for start in range(0, len(candidate_ids), EXISTENCE_PROBE_SIZE):
+            probe = candidate_ids[start:start + EXISTENCE_PROBE_SIZE]
+            response = collection.query.fetch_objects(
+                filters=Filter.by_id().contains_any(probe),
+                limit=len(probe),
+                return_properties=[]
+            )
+            existing_ids.update(str(obj.uuid) for obj in response.objects)
+        
+        skipped = len(documents) - len(unique) + len(existing_ids)
+        if skipped:
+            logger.info(f"{skipped} documentos ignorados por já estarem indexados ou repetidos no lote")
+        
+        # Manter o UUID calculado aqui para não recalculá-lo na preparação
+        return [(doc_uuid, document) for doc_uuid, document in unique.items() if doc_uuid not in existing_ids]
+    
+    def _prepare_chunk(self, chunk):
+        """
+        Prepara um trecho de documentos para o lote: embeddings, propriedades e UUIDs.
+        
+        Args:
+            chunk (list): Pares (uuid, documento) do trecho (até EMBEDDING_BATCH_SIZE)
+            
+        Returns:
+            list: Tuplas (propriedades, uuid, vetor) prontas para o lote
+        """
+        texts = [document.get('text', '') for _, document in chunk]
+        
+        # Gerar os embeddings do trecho em uma única chamada
+        vectors = self.embed_texts(texts)
+        
+        # Propriedades montadas pela função criada para o esquema; o UUID
+        # baseado no conteúdo já foi calculado na deduplicação
+        build_properties = self._build_properties
+        return [
+            (build_properties(text, document.get('metadata', {})), doc_uuid, vector)
+            for (doc_uuid, document), text, vector in zip(chunk, texts, vectors)
+        ]
+    
     def batch_add_documents(self, documents, class_name="Document", batch_size=100):
         """
         Adiciona múltiplos documentos ao Weaviate em lote.
         
+        Threads produtoras geram embeddings, propriedades e UUIDs de cada trecho
+        e os entregam por uma fila limitada à thread chamadora, que alimenta o
+        lote do Weaviate. Assim as chamadas à OpenAI se sobrepõem ao envio.
+        
         Args:
             documents (list): Lista de documentos a serem adicionados
             class_name (str): Nome da classe no Weaviate
@@ -231,59 +540,113 @@ class WeaviateClient:
             return 0
         
         try:
-            # Iniciar o lote usando a API v4
-            with self.client.batch.dynamic() as batch:
-                # Configurar o tamanho do lote
-                batch.batch_size = batch_size
-                
-                # Contador de documentos adicionados
-                added_count = 0
-                
-                for document in documents:
-                    # Extrair texto e metadados do documento
-                    text = document.get('text', '')
-                    metadata = document.get('metadata', {})
-                    
-                    # Preparar propriedades para o Weaviate
-                    properties = {
-                        "content": text,
-                        "tipo": metadata.get('tipo', 'documento'),
-                        "filename": metadata.get('filename', ''),
-                        "file_path": metadata.get('path', '')
-                    }
-                    
-                    # Adicionar outros metadados disponíveis
-                    for key, value in metadata.items():
-                        if key not in ['tipo', 'filename', 'path']:
-                            properties[key] = value
+            collection = self.client.collections.get(class_name)
+            
+            # Evitar embeddings e envios de documentos já indexados
+            pending = self._filter_new_documents(collection, documents)
+        except Exception as e:
+            logger.error(f"Erro ao verificar documentos existentes no Weaviate: {e}")
+            return 0
+        
+        # Trechos de documentos a serem preparados pelas produtoras
+        chunks = queue.Queue()
+        for start in range(0, len(pending), EMBEDDING_BATCH_SIZE):
+            chunks.put(pending[start:start + EMBEDDING_BATCH_SIZE])
+        
+        # Fila limitada entre produtoras e consumidora
+        prepared = queue.Queue(maxsize=2 * batch_size)
+        stop = threading.Event()
+        errors = []
+        
+        def offer(item):
+            # Não bloquear indefinidamente se a consumidora desistir
+            while not stop.is_set():
+                try:
+                    prepared.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+        
+        def produce():
+            try:
+                while not stop.is_set():
+                    try:
+                        chunk = chunks.get_nowait()
+                    except queue.Empty:
+                        return
+                    for item in self._prepare_chunk(chunk):
+                        offer(item)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                # Sentinela indicando o fim desta produtora
+                offer(None)
+        
+        producers = [
+            threading.Thread(target=produce, daemon=True)
+            for _ in range(max(1, min(INGEST_PRODUCER_THREADS, chunks.qsize())))
+        ]
+        
+        try:
+            # Contador de documentos enviados
+            added_count = 0
+            
+            for producer in producers:
+                producer.start()
+            
+            # Iniciar o lote usando a API v4 (enviado via gRPC)
+            with collection.batch.fixed_size(batch_size=batch_size) as batch:
+                finished = 0
+                while finished < len(producers):
+                    item = prepared.get()
+                    if item is None:
+                        finished += 1
+                        continue
                     
-                    # Gerar UUID baseado no conteúdo para evitar duplicatas
-                    doc_uuid = str(uuid.uuid5(uuid.NAMESPACE_DNS, text[:1000]))
+                    properties, doc_uuid, vector = item
                     
-                    # Adicionar ao lote usando a API v4
-                    batch.add_data_object(
+                    # Adicionar ao lote usando a API v4, com o vetor pré-calculado
+                    batch.add_object(
                         properties=properties,
-                        class_name=class_name,
-                        uuid=doc_uuid
+                        uuid=doc_uuid,
+                        vector=vector
                     )
                     
                     added_count += 1
             
+            if errors:
+                raise errors[0]
+            
+            # Descontar objetos rejeitados pelo servidor
+            failed_objects = collection.batch.failed_objects
+            if failed_objects:
+                logger.error(f"{len(failed_objects)} documentos rejeitados no lote: {failed_objects[0].message}")
+                added_count -= len(failed_objects)
+            
             logger.info(f"{added_count} documentos adicionados ao Weaviate em lote")
             return added_count
             
         except Exception as e:
             logger.error(f"Erro ao adicionar documentos em lote ao Weaviate: {e}")
             return 0
+        finally:
+            stop.set()
     
-    def search_documents(self, query, class_name="Document", limit=5):
+    def search_documents(self, query, class_name="Document", limit=3, properties=None):
         """
-        Realiza uma busca semântica no Weaviate.
+        Realiza uma busca híbrida (BM25 + vetorial) no Weaviate.
+        
+        As duas buscas são combinadas no servidor em uma única requisição, o que
+        recupera também consultas por termos exatos que a busca vetorial perde.
+        
+        Por padrão retorna apenas metadados (SEARCH_METADATA_PROPERTIES) e o ID
+        de cada objeto; o conteúdo, bem maior, pode ser obtido com fetch_content.
         
         Args:
             query (str): Consulta em linguagem natural
             class_name (str): Nome da classe no Weaviate
             limit (int): Número máximo de resultados
+            properties (list, optional): Propriedades a serem retornadas
             
         Returns:
             list: Lista de documentos encontrados
@@ -294,15 +657,20 @@ class WeaviateClient:
         
         try:
             # Definir as propriedades a serem retornadas
-            properties = ["content", "tipo", "filename", "file_path"]
-            
-            # Executar a consulta usando a API v4
-            response = (
-                self.client.query
-                .get(class_name, properties)
-                .with_near_text({"concepts": [query]})
-                .with_limit(limit)
-                .do()
+            if properties is None:
+                properties = SEARCH_METADATA_PROPERTIES
+            
+            # Vetorizar a consulta com o mesmo modelo usado na indexação
+            query_vector = self.embed_texts([query])[0]
+            
+            # Executar a consulta híbrida usando a API v4 (gRPC)
+            response = self.client.collections.get(class_name).query.hybrid(
+                query=query,
+                vector=query_vector,
+                alpha=HYBRID_ALPHA,
+                query_properties=HYBRID_QUERY_PROPERTIES,
+                limit=limit,
+                return_properties=properties
             )
             
             # Extrair documentos do resultado
@@ -314,6 +682,65 @@ class WeaviateClient:
         except Exception as e:
             logger.error(f"Erro ao realizar busca no Weaviate: {e}")
             return []
+    
+    def fetch_content(self, doc_id, class_name="Document"):
+        """
+        Obtém o conteúdo textual de um documento pelo seu ID.
+        
+        Args:
+            doc_id (str): UUID do documento no Weaviate
+            class_name (str): Nome da classe no Weaviate
+            
+        Returns:
+            str: Conteúdo do documento, ou string vazia se não encontrado
+        """
+        if not self.is_connected():
+            logger.error("Cliente não está conectado ao Weaviate")
+            return ""
+        
+        try:
+            obj = self.client.collections.get(class_name).query.fetch_object_by_id(
+                doc_id,
+                return_properties=["content"]
+            )
+            return obj.properties.get("content", "") if obj is not None else ""
+            
+        except Exception as e:
+            logger.error(f"Erro ao obter conteúdo do documento {doc_id}: {e}")
+            return ""
+    
+    def list_documents(self, class_name="Document", limit=100, after=None, properties=None):
+        """
+        Lista documentos da classe em páginas, usando cursor por ID.
+        
+        Para obter a página seguinte, passe em `after` o UUID do último objeto
+        da página atual; o servidor continua a partir dele sem percorrer as
+        páginas anteriores.
+        
+        Args:
+            class_name (str): Nome da classe no Weaviate
+            limit (int): Tamanho da página
+            after (str, optional): UUID do último documento da página anterior
+            properties (list, optional): Propriedades a serem retornadas
+            
+        Returns:
+            list: Documentos da página (vazia ao fim da coleção ou em caso de erro)
+        """
+        if not self.is_connected():
+            logger.error("Cliente não está conectado ao Weaviate")
+            return []
+        
+        try:
+            response = self.client.collections.get(class_name).query.fetch_objects(
+                limit=limit,
+                after=after,
+                return_properties=properties if properties is not None else SEARCH_METADATA_PROPERTIES
+            )
+            return response.objects
+            
+        except Exception as e:
+            logger.error(f"Erro ao listar documentos do Weaviate: {e}")
+            return []
 
 def load_processed_documents(processed_dir):
     """
@@ -370,5 +797,7 @@ if __name__ == "__main__":
             
             # Adicionar documentos ao Weaviate
             client.batch_add_documents(documents)
+        
+        client.close()
     else:
         print("Uso: python weaviate_integration.py weaviate_url api_key processed_dir")
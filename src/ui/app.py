@@ -9,9 +9,13 @@ import os
 import sys
 import json
 import time
+import string
+from collections import defaultdict
 
-# Adicionar o diretório pai ao path para importar módulos
+# Adicionar o diretório pai ao path para importar módulos, e a raiz do
+# repositório para os módulos importados como src.*
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from ui.rag_connector import create_rag_connector
 from ui.feedback_manager import create_feedback_manager
 from ui.flow_visualization import display_flow_visualization
@@ -24,9 +28,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Adicionar CSS personalizado
-def load_css():
-    st.markdown("""
+# CSS personalizado, compactado uma única vez na importação do módulo
+_CSS_BLOCK = " ".join("""
     <style>
     .main-header {
         font-size: 2rem;
@@ -67,7 +70,13 @@ def load_css():
         margin-top: 10px;
     }
     </style>
-    """, unsafe_allow_html=True)
+""".split())
+
+# Adicionar CSS personalizado
+def load_css():
+    # O Streamlit descarta elementos não renderizados no rerun, então o
+    # bloco precisa ser reenviado a cada execução do script
+    st.markdown(_CSS_BLOCK, unsafe_allow_html=True)
 
 load_css()
 
@@ -97,13 +106,14 @@ def get_feedback_manager():
     return create_feedback_manager()
 
 # Função para consultar o sistema RAG
-def query_rag_system(query, filters=None):
+def query_rag_system(query, filters=None, stream=False):
     """
     Consulta o sistema RAG.
     
     Args:
         query (str): A consulta do usuário
         filters (dict): Filtros opcionais
+        stream (bool): Se True, a resposta pode vir como gerador de trechos
         
     Returns:
         dict: Resultados da consulta
@@ -116,12 +126,51 @@ def query_rag_system(query, filters=None):
     
     try:
         # Processar a consulta usando o conector RAG
-        results = connector.process_query(query, filters)
+        results = connector.process_query(query, filters, stream=stream)
         return results
     except Exception as e:
         st.error(f"Erro ao processar consulta: {e}")
         return fallback_results(query)
 
+# Caminho dos resultados de exemplo usados como fallback
+FALLBACK_RESULTS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "data/processed/validation_results.json"
+)
+
+def _tokenize(text):
+    """
+    Normaliza um texto em tokens minúsculos sem pontuação nas bordas.
+    
+    Args:
+        text (str): Texto a ser tokenizado
+        
+    Returns:
+        list: Lista de tokens
+    """
+    return [token for token in (word.strip(string.punctuation) for word in text.lower().split()) if token]
+
+# Carregar os resultados de exemplo uma única vez por processo
+@st.cache_resource
+def _fallback_corpus():
+    """
+    Carrega os resultados de exemplo e constrói um índice invertido token -> chaves.
+    
+    Returns:
+        tuple: (resultados de exemplo, índice de tokens, ordem original das chaves)
+    """
+    with open(FALLBACK_RESULTS_PATH, "r", encoding="utf-8") as f:
+        all_results = json.load(f)
+    
+    token_index = defaultdict(list)
+    key_order = {}
+    for position, key in enumerate(all_results):
+        key_order[key] = position
+        for token in set(_tokenize(key)):
+            token_index[token].append(key)
+    
+    return all_results, token_index, key_order
+
 # Função de fallback para resultados em caso de erro
 def fallback_results(query):
     """
@@ -134,14 +183,14 @@ def fallback_results(query):
         dict: Resultados de exemplo
     """
     try:
-        # Tentar carregar resultados de exemplo
-        with open(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data/processed/validation_results.json"), "r", encoding="utf-8") as f:
-            all_results = json.load(f)
-            
-        # Tentar encontrar uma consulta similar nos resultados de exemplo
-        for key, value in all_results.items():
-            if any(word in key.lower() for word in query.lower().split()):
-                return value
+        # Carregar resultados de exemplo (em cache após a primeira chamada)
+        all_results, token_index, key_order = _fallback_corpus()
+        
+        # Procurar chaves que compartilham tokens com a consulta
+        candidate_keys = set().union(*(token_index.get(token, ()) for token in _tokenize(query)))
+        if candidate_keys:
+            # Preservar a ordem do arquivo ao escolher entre os candidatos
+            return all_results[min(candidate_keys, key=key_order.__getitem__)]
                 
         # Se não encontrar, retornar o primeiro resultado
         return next(iter(all_results.values()))
@@ -282,17 +331,21 @@ def render_query_area(sidebar_config):
     if submit_button and query:
         with st.spinner("Processando sua consulta..."):
             # Obter resultados do sistema RAG
-            results = query_rag_system(query, sidebar_config)
+            results = query_rag_system(query, sidebar_config, stream=True)
+            
+            # Exibir resposta, em streaming quando disponível
+            st.markdown("<h2 class='sub-header'>Resposta</h2>", unsafe_allow_html=True)
+            if isinstance(results["response"], str):
+                response = results["response"]
+                st.markdown(response)
+            else:
+                response = st.write_stream(results["response"])
             
             # Armazenar resultados na sessão para uso no feedback
             st.session_state.last_query = query
-            st.session_state.last_response = results["response"]
+            st.session_state.last_response = response
             st.session_state.last_sources = results["results"]
             
-            # Exibir resposta
-            st.markdown("<h2 class='sub-header'>Resposta</h2>", unsafe_allow_html=True)
-            st.markdown(results["response"])
-            
             # Exibir fontes
             st.markdown("<h2 class='sub-header'>Fontes Utilizadas</h2>", unsafe_allow_html=True)
             
@@ -5,12 +5,35 @@ Este módulo fornece funções para coletar, armazenar e analisar feedback do us
 """
 
 import os
+import sys
+import csv
+import glob
 import json
+import mmap
+import queue
+import itertools
+import atexit
 import datetime
-import pandas as pd
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from pathlib import Path
 
+# Usar o cache de recursos do Streamlit apenas se ele já foi carregado pela
+# aplicação; importá-lo aqui custaria centenas de ms a scripts e testes
+_streamlit = sys.modules.get('streamlit')
+if _streamlit is not None:
+    _cache_resource = _streamlit.cache_resource
+else:
+    _cache_resource = functools.lru_cache(maxsize=None)
+
+# orjson é bem mais rápido que o json da biblioteca padrão; usar se disponível
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -18,38 +41,369 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Diretório padrão dos feedbacks, resolvido uma única vez na importação
+DEFAULT_FEEDBACK_DIR = str(Path(__file__).resolve().parents[2] / 'data' / 'feedback')
+
+# Espera, após o último feedback, antes de gravar os pendentes em disco
+FLUSH_DELAY_SECONDS = 0.5
+
+# Quantidade de feedbacks pendentes que força a gravação imediata
+FLUSH_MAX_BUFFER = 50
+
+# Tentativas de gravação de um lote antes de separá-lo em FAILED_FEEDBACK_FILE
+WRITE_MAX_ATTEMPTS = 5
+
+# Arquivo, no diretório de feedback, que recebe os lotes que não puderam ser gravados
+FAILED_FEEDBACK_FILE = 'failed_feedback.jsonl'
+
+# Item da fila que encerra a thread de gravação (ver close)
+_STOP = object()
+
+def _dumps(obj):
+    """
+    Serializa um objeto em JSON compacto.
+    
+    Args:
+        obj: Objeto serializável
+        
+    Returns:
+        bytes: JSON codificado em UTF-8
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def _loads(data):
+    """
+    Desserializa JSON (str ou bytes). Erros de formato geram json.JSONDecodeError,
+    da qual orjson.JSONDecodeError é subclasse.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Tamanho a partir do qual o arquivo de feedback ativo é arquivado (rotacionado)
+FEEDBACK_MAX_BYTES = 50 * 1024 * 1024
+
+# Colunas do CSV exportado
+EXPORT_FIELDS = ['timestamp', 'query', 'response', 'sources', 'is_helpful', 'comments']
+
 class FeedbackManager:
     """
     Classe para gerenciar o feedback do usuário.
     """
     
-    def __init__(self, feedback_dir=None):
+    def __init__(self, feedback_dir=None, max_bytes=FEEDBACK_MAX_BYTES):
         """
         Inicializa o gerenciador de feedback.
         
         Args:
             feedback_dir (str): Diretório para armazenar os feedbacks
+            max_bytes (int): Tamanho a partir do qual o arquivo ativo é arquivado
+                como user_feedback.<data>.jsonl e um novo é iniciado
         """
-        if feedback_dir is None:
-            # Usar diretório padrão se não for especificado
-            self.feedback_dir = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-                'data',
-                'feedback'
-            )
-        else:
-            self.feedback_dir = feedback_dir
+        # Usar diretório padrão se não for especificado
+        self.feedback_dir = feedback_dir or DEFAULT_FEEDBACK_DIR
         
         # Garantir que o diretório exista
         os.makedirs(self.feedback_dir, exist_ok=True)
         
-        # Caminho para o arquivo de feedback
-        self.feedback_file = os.path.join(self.feedback_dir, 'user_feedback.json')
+        # Caminho para o arquivo de feedback (JSON lines, um feedback por linha)
+        self.feedback_file = os.path.join(self.feedback_dir, 'user_feedback.jsonl')
+        self.max_bytes = max_bytes
         
         # Inicializar arquivo de feedback se não existir
         if not os.path.exists(self.feedback_file):
-            with open(self.feedback_file, 'w', encoding='utf-8') as f:
-                json.dump([], f)
+            self._migrate_legacy_file(os.path.join(self.feedback_dir, 'user_feedback.json'))
+        
+        # Contadores persistidos junto ao arquivo de feedback: os gravados em
+        # disco e os em memória, que incluem os feedbacks ainda na fila
+        self.stats_file = os.path.join(self.feedback_dir, 'stats.json')
+        self._written_stats = self._load_stats()
+        self._stats = dict(self._written_stats)
+        self._lock = threading.Lock()
+        
+        # Fila consumida pela thread de gravação, para não bloquear a interface
+        self._queue = queue.Queue()
+        self._write_ok = True
+        self._closed = False
+        self._writer = threading.Thread(target=self._writer_loop, name="feedback-writer", daemon=True)
+        self._writer.start()
+        
+        # Gravar o que restar na fila ao encerrar o processo, se close não
+        # tiver sido chamado antes
+        atexit.register(self.close)
+    
+    def _migrate_legacy_file(self, legacy_file):
+        """
+        Converte o antigo arquivo JSON (uma lista de feedbacks) para JSON lines.
+        
+        Os horários, gravados antes em hora local sem fuso, são convertidos para
+        ISO 8601 em UTC, o mesmo formato dos novos feedbacks. O arquivo antigo é
+        preservado com a extensão .bak. Se ele não existir ou
+        não puder ser lido, apenas cria o arquivo de feedback vazio (o arquivo
+        ilegível também é preservado como .bak).
+        
+        Args:
+            legacy_file (str): Caminho do arquivo JSON antigo
+        """
+        feedbacks = []
+        if os.path.exists(legacy_file):
+            try:
+                with open(legacy_file, 'rb') as f:
+                    feedbacks = _loads(f.read())
+            except json.JSONDecodeError as e:
+                logger.error(f"Erro ao ler feedbacks antigos de {legacy_file}; arquivo preservado como {legacy_file}.bak: {e}")
+        
+        # Gravar em arquivo temporário e renomear, para não deixar migração pela metade
+        temp_file = self.feedback_file + '.tmp'
+        with open(temp_file, 'wb') as f:
+            f.writelines(
+                _dumps({**feedback, 'timestamp': self._legacy_timestamp_to_utc(feedback.get('timestamp'))}) + b'\n'
+                for feedback in feedbacks
+            )
+        os.replace(temp_file, self.feedback_file)
+        
+        if os.path.exists(legacy_file):
+            os.replace(legacy_file, legacy_file + '.bak')
+            logger.info(f"{len(feedbacks)} feedbacks migrados de {legacy_file} para {self.feedback_file}")
+    
+    @staticmethod
+    def _legacy_timestamp_to_utc(timestamp):
+        """
+        Converte um horário do arquivo antigo (ISO 8601 em hora local, sem fuso)
+        para ISO 8601 em UTC com precisão de segundos.
+        
+        Args:
+            timestamp (str): Horário do feedback antigo
+            
+        Returns:
+            str: Horário em UTC, ou o valor original se não puder ser interpretado
+        """
+        try:
+            parsed = datetime.datetime.fromisoformat(timestamp)
+        except (TypeError, ValueError):
+            return timestamp
+        # astimezone interpreta horários sem fuso como hora local
+        return parsed.astimezone(datetime.timezone.utc).isoformat(timespec='seconds')
+    
+    def _log_files(self):
+        """
+        Lista os arquivos de feedback em ordem cronológica: os arquivados
+        (user_feedback.<data>.jsonl) e, por último, o ativo.
+        
+        Returns:
+            list: Caminhos dos arquivos
+        """
+        return sorted(glob.glob(os.path.join(self.feedback_dir, 'user_feedback.*.jsonl'))) + [self.feedback_file]
+    
+    def _iter_feedback(self, segments=None):
+        """
+        Percorre os feedbacks gravados, um por vez.
+        
+        Args:
+            segments (list, optional): Trechos (caminho, início, fim) a percorrer,
+                com posições em bytes no início de linhas e fim None para ler até
+                o final do arquivo; por padrão, todos os arquivos de feedback
+        
+        Yields:
+            dict: Feedback
+        """
+        if segments is None:
+            segments = [(path, 0, None) for path in self._log_files()]
+        
+        for path, start, end in segments:
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                # Arquivo rotacionado entre a listagem e a leitura
+                continue
+            
+            with f:
+                # mmap não aceita arquivos vazios
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue
+                
+                # Mapear o arquivo: as páginas são carregadas pelo sistema sob demanda
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    mm.seek(start)
+                    position = start
+                    for line in iter(mm.readline, b''):
+                        if end is not None and position >= end:
+                            break
+                        position += len(line)
+                        if not line.strip():
+                            continue
+                        try:
+                            yield _loads(line)
+                        except json.JSONDecodeError as e:
+                            # Linha truncada (ex.: escrita interrompida) não invalida o restante
+                            logger.warning(f"Linha inválida em {path} (byte {position - len(line)}): {e}")
+    
+    @staticmethod
+    def _tail_offset(path, count):
+        """
+        Localiza, varrendo o arquivo de trás para frente, o início das últimas
+        `count` linhas não vazias.
+        
+        Args:
+            path (str): Caminho do arquivo
+            count (int): Quantidade de linhas
+            
+        Returns:
+            tuple: Posição (em bytes) da primeira dessas linhas e quantas foram
+                encontradas (menos que `count` se o arquivo não tiver tantas)
+        """
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if count <= 0 or size == 0:
+                return size, 0
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = size
+                found = 0
+                while end > 0:
+                    start = mm.rfind(b'\n', 0, end - 1) + 1
+                    if mm[start:end].strip():
+                        found += 1
+                        if found == count:
+                            return start, found
+                    end = start
+                return 0, found
+    
+    def _tail_segments(self, count):
+        """
+        Obtém os trechos que contêm os últimos `count` feedbacks, começando pelo
+        arquivo ativo e recuando pelos arquivados apenas se necessário.
+        
+        Args:
+            count (int): Quantidade de feedbacks
+            
+        Returns:
+            list: Trechos (caminho, início, fim) em ordem cronológica
+        """
+        segments = []
+        for path in reversed(self._log_files()):
+            if count <= 0:
+                break
+            start, found = self._tail_offset(path, count)
+            segments.append((path, start, None))
+            count -= found
+        segments.reverse()
+        return segments
+    
+    def _shard_ranges(self, shards):
+        """
+        Divide os arquivos de feedback em trechos alinhados a linhas, com
+        quantidade de trechos por arquivo proporcional ao seu tamanho.
+        
+        Args:
+            shards (int): Quantidade desejada de trechos
+            
+        Returns:
+            list: Trechos (caminho, início, fim) não vazios, em ordem
+        """
+        sizes = [(path, os.path.getsize(path)) for path in self._log_files()]
+        total = sum(size for _, size in sizes)
+        
+        segments = []
+        for path, size in sizes:
+            if not size:
+                continue
+            parts = max(1, round(shards * size / total))
+            boundaries = [0]
+            with open(path, 'rb') as f:
+                for i in range(1, parts):
+                    # Avançar até o início da próxima linha
+                    f.seek(max(size * i // parts, boundaries[-1]))
+                    if f.tell() > 0:
+                        f.seek(f.tell() - 1)
+                        f.readline()
+                    boundaries.append(f.tell())
+            boundaries.append(size)
+            segments.extend((path, start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start)
+        return segments
+    
+    def _write_csv(self, output_path, segments=None):
+        """
+        Grava em CSV, linha a linha, os feedbacks dos trechos indicados.
+        
+        Args:
+            output_path (str): Caminho do arquivo CSV de saída
+            segments (list, optional): Trechos (caminho, início, fim); por padrão,
+                todos os arquivos de feedback
+            
+        Returns:
+            int: Quantidade de feedbacks exportados
+        """
+        exported = 0
+        with open(output_path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for feedback in self._iter_feedback(segments):
+                # Fontes são uma lista de objetos; exportar como JSON
+                feedback['sources'] = _dumps(feedback.get('sources', [])).decode('utf-8')
+                writer.writerow(feedback)
+                exported += 1
+        return exported
+    
+    def _load_stats(self):
+        """
+        Carrega os contadores de feedback, reconstruindo-os se estiverem ausentes
+        ou desatualizados.
+        
+        Na reconstrução, apenas o arquivo ativo é relido quando os contadores dos
+        arquivos já rotacionados ('archived') estão disponíveis.
+        
+        Returns:
+            dict: Contadores 'total', 'helpful_count', 'with_comments_count',
+                'log_size' (tamanho do arquivo ativo contabilizado) e 'archived'
+                (contadores dos arquivos rotacionados)
+        """
+        log_size = os.path.getsize(self.feedback_file)
+        archived = None
+        
+        try:
+            with open(self.stats_file, 'rb') as f:
+                stats = _loads(f.read())
+            # O tamanho registrado detecta gravações que não chegaram aos contadores
+            if stats.get('log_size') == log_size:
+                stats.setdefault('archived', {'total': 0, 'helpful_count': 0, 'with_comments_count': 0})
+                return stats
+            archived = stats.get('archived')
+        except (json.JSONDecodeError, FileNotFoundError):
+            pass
+        
+        if archived is None:
+            logger.info(f"Reconstruindo estatísticas de feedback a partir de {self.feedback_dir}")
+            archived = {'total': 0, 'helpful_count': 0, 'with_comments_count': 0}
+            rotated = [(path, 0, None) for path in self._log_files()[:-1]]
+            for feedback in self._iter_feedback(rotated):
+                self._count(archived, feedback.get('is_helpful', False), feedback.get('comments', ''))
+        else:
+            logger.info(f"Reconstruindo estatísticas de feedback a partir de {self.feedback_file}")
+        
+        stats = dict(archived, log_size=log_size, archived=archived)
+        for feedback in self._iter_feedback([(self.feedback_file, 0, None)]):
+            self._count(stats, feedback.get('is_helpful', False), feedback.get('comments', ''))
+        self._write_stats(stats)
+        return stats
+    
+    @staticmethod
+    def _count(stats, is_helpful, comments, delta=1):
+        """Contabiliza um feedback nos contadores (ou o retira, com delta=-1)."""
+        stats['total'] += delta
+        if is_helpful:
+            stats['helpful_count'] += delta
+        if (comments or '').strip():
+            stats['with_comments_count'] += delta
+    
+    def _write_stats(self, stats):
+        """Grava os contadores de forma atômica (arquivo temporário + renomeação)."""
+        temp_file = self.stats_file + '.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(_dumps(stats))
+        os.replace(temp_file, self.stats_file)
     
     def save_feedback(self, query, response, sources, is_helpful, comments=None):
         """
@@ -65,10 +419,14 @@ class FeedbackManager:
         Returns:
             bool: True se o feedback foi salvo com sucesso, False caso contrário
         """
+        if self._closed:
+            logger.error("Erro ao salvar feedback: gerenciador de feedback encerrado")
+            return False
+        
         try:
             # Criar objeto de feedback
             feedback = {
-                'timestamp': datetime.datetime.now().isoformat(),
+                'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
                 'query': query,
                 'response': response,
                 'sources': sources,
@@ -76,19 +434,14 @@ class FeedbackManager:
                 'comments': comments or ''
             }
             
-            # Carregar feedbacks existentes
-            try:
-                with open(self.feedback_file, 'r', encoding='utf-8') as f:
-                    feedbacks = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                feedbacks = []
+            # Serializar aqui, e não na thread de gravação: um feedback que não
+            # pode ser serializado é recusado sem bloquear os demais
+            line = _dumps(feedback) + b'\n'
             
-            # Adicionar novo feedback
-            feedbacks.append(feedback)
-            
-            # Salvar feedbacks atualizados
-            with open(self.feedback_file, 'w', encoding='utf-8') as f:
-                json.dump(feedbacks, f, ensure_ascii=False, indent=2)
+            # Enfileirar para a thread de gravação e retornar imediatamente
+            with self._lock:
+                self._count(self._stats, is_helpful, comments)
+            self._queue.put((line, is_helpful, comments))
             
             logger.info(f"Feedback salvo com sucesso: {is_helpful}")
             return True
@@ -97,16 +450,178 @@ class FeedbackManager:
             logger.error(f"Erro ao salvar feedback: {e}")
             return False
     
-    def get_all_feedback(self):
+    def _writer_loop(self):
+        """
+        Consome a fila de feedbacks e grava em lotes.
+        
+        Os pendentes são gravados em uma única escrita quando a fila fica
+        FLUSH_DELAY_SECONDS sem novos feedbacks, quando somam FLUSH_MAX_BUFFER
+        ou quando _flush é chamado. Após WRITE_MAX_ATTEMPTS falhas seguidas, os
+        pendentes são separados (ver _set_aside) para não bloquear os próximos.
+        """
+        pending = []
+        failures = 0
+        while True:
+            try:
+                item = self._queue.get(timeout=FLUSH_DELAY_SECONDS if pending else None)
+            except queue.Empty:
+                item = None
+            
+            if isinstance(item, tuple):
+                pending.append(item)
+                if len(pending) < FLUSH_MAX_BUFFER:
+                    continue
+            
+            # Gravar por tempo, por tamanho do lote ou a pedido (ver _flush)
+            pending = self._write_batch(pending)
+            failures = failures + 1 if pending else 0
+            if failures >= WRITE_MAX_ATTEMPTS:
+                self._set_aside(pending)
+                pending = []
+                failures = 0
+            
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                # Última tentativa: o que não pôde ser gravado é separado
+                if pending:
+                    self._set_aside(pending)
+                return
+    
+    def _write_batch(self, feedbacks):
+        """
+        Acrescenta os feedbacks ao arquivo em uma única escrita e atualiza os
+        contadores persistidos. Executado apenas pela thread de gravação.
+        
+        Args:
+            feedbacks (list): Feedbacks a gravar, como (linha JSON, is_helpful, comments)
+            
+        Returns:
+            list: Feedbacks não gravados (vazia em caso de sucesso), para nova tentativa
+        """
+        if not feedbacks:
+            self._write_ok = True
+            return []
+        
+        try:
+            with open(self.feedback_file, 'ab') as f:
+                f.write(b''.join(line for line, _, _ in feedbacks))
+        except OSError as e:
+            logger.error(f"Erro ao gravar feedbacks: {e}")
+            self._write_ok = False
+            return feedbacks
+        
+        self._write_ok = True
+        for _, is_helpful, comments in feedbacks:
+            self._count(self._written_stats, is_helpful, comments)
+        
+        try:
+            log_size = os.path.getsize(self.feedback_file)
+            if log_size > self.max_bytes:
+                self._rotate()
+                log_size = 0
+            self._written_stats['log_size'] = log_size
+            self._write_stats(self._written_stats)
+        except Exception as e:
+            # Os contadores serão reconstruídos na próxima inicialização
+            logger.error(f"Erro ao gravar estatísticas de feedback: {e}")
+        return []
+    
+    def _rotate(self):
+        """
+        Arquiva o arquivo de feedback ativo e inicia um novo, vazio. Os contadores
+        atuais passam a ser os dos arquivos arquivados. Executado apenas pela
+        thread de gravação.
+        """
+        base, ext = os.path.splitext(self.feedback_file)
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        rotated_file = f"{base}.{stamp}{ext}"
+        suffix = 1
+        while os.path.exists(rotated_file):
+            rotated_file = f"{base}.{stamp}_{suffix}{ext}"
+            suffix += 1
+        
+        os.replace(self.feedback_file, rotated_file)
+        open(self.feedback_file, 'wb').close()
+        
+        self._written_stats['archived'] = {
+            key: self._written_stats[key] for key in ('total', 'helpful_count', 'with_comments_count')
+        }
+        logger.info(f"Arquivo de feedback arquivado em {rotated_file}")
+    
+    def _set_aside(self, feedbacks):
+        """
+        Separa em FAILED_FEEDBACK_FILE um lote que não pôde ser gravado, para
+        recuperação manual, e o retira dos contadores em memória. Executado
+        apenas pela thread de gravação.
+        
+        Args:
+            feedbacks (list): Feedbacks como (linha JSON, is_helpful, comments)
+        """
+        failed_file = os.path.join(self.feedback_dir, FAILED_FEEDBACK_FILE)
+        try:
+            with open(failed_file, 'ab') as f:
+                f.write(b''.join(line for line, _, _ in feedbacks))
+            logger.error(f"{len(feedbacks)} feedbacks não gravados foram separados em {failed_file}")
+        except OSError as e:
+            logger.error(f"{len(feedbacks)} feedbacks descartados após {WRITE_MAX_ATTEMPTS} tentativas de gravação: {e}")
+        
+        with self._lock:
+            for _, is_helpful, comments in feedbacks:
+                self._count(self._stats, is_helpful, comments, -1)
+    
+    def _flush(self):
+        """
+        Aguarda a gravação de todos os feedbacks enfileirados até o momento.
+        
+        Returns:
+            bool: True se os feedbacks foram gravados, False em caso de erro
+        """
+        if self._closed:
+            return self._write_ok
+        
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        return self._write_ok
+    
+    def close(self):
+        """
+        Grava os feedbacks pendentes e encerra a thread de gravação.
+        
+        Chamado ao final do processo se não for chamado antes; depois dele,
+        save_feedback recusa novos feedbacks.
+        
+        Returns:
+            bool: True se os feedbacks foram gravados, False em caso de erro
+        """
+        if self._closed:
+            return self._write_ok
+        
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(_STOP)
+        self._writer.join()
+        return self._write_ok
+    
+    def get_all_feedback(self, limit=None, tail=None):
         """
         Obtém todos os feedbacks.
         
+        Args:
+            limit (int, optional): Quantidade máxima de feedbacks, a partir do início
+            tail (int, optional): Obter apenas os últimos `tail` feedbacks, sem
+                decodificar os anteriores
+        
         Returns:
-            list: Lista de feedbacks
+            list: Lista de feedbacks, do mais antigo para o mais recente
         """
+        # Incluir os feedbacks ainda em buffer
+        self._flush()
+        
         try:
-            with open(self.feedback_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            segments = self._tail_segments(tail) if tail is not None else None
+            return list(itertools.islice(self._iter_feedback(segments), limit))
         except Exception as e:
             logger.error(f"Erro ao obter feedbacks: {e}")
             return []
@@ -118,9 +633,13 @@ class FeedbackManager:
         Returns:
             dict: Estatísticas de feedback
         """
-        feedbacks = self.get_all_feedback()
+        # Contadores mantidos incrementalmente, sem reler o arquivo
+        with self._lock:
+            total = self._stats['total']
+            helpful_count = self._stats['helpful_count']
+            with_comments_count = self._stats['with_comments_count']
         
-        if not feedbacks:
+        if not total:
             return {
                 'total': 0,
                 'helpful_count': 0,
@@ -131,46 +650,47 @@ class FeedbackManager:
                 'with_comments_percentage': 0
             }
         
-        total = len(feedbacks)
-        helpful_count = sum(1 for f in feedbacks if f.get('is_helpful', False))
-        with_comments_count = sum(1 for f in feedbacks if f.get('comments', '').strip())
-        
         return {
             'total': total,
             'helpful_count': helpful_count,
-            'helpful_percentage': (helpful_count / total) * 100 if total > 0 else 0,
+            'helpful_percentage': (helpful_count / total) * 100,
             'unhelpful_count': total - helpful_count,
-            'unhelpful_percentage': ((total - helpful_count) / total) * 100 if total > 0 else 0,
+            'unhelpful_percentage': ((total - helpful_count) / total) * 100,
             'with_comments_count': with_comments_count,
-            'with_comments_percentage': (with_comments_count / total) * 100 if total > 0 else 0
+            'with_comments_percentage': (with_comments_count / total) * 100
         }
     
-    def export_feedback_to_csv(self, output_path=None):
+    def export_feedback_to_csv(self, output_path=None, shards=1):
         """
         Exporta os feedbacks para um arquivo CSV.
         
+        Com shards > 1, o histórico é dividido em partes gravadas em paralelo,
+        cada uma em um arquivo <nome>_part<i>.csv.
+        
         Args:
             output_path (str): Caminho para o arquivo CSV de saída
+            shards (int): Quantidade de arquivos a gerar em paralelo
             
         Returns:
-            str: Caminho para o arquivo CSV gerado ou None em caso de erro
+            str | list: Caminho para o arquivo CSV gerado (ou lista de caminhos,
+                se shards > 1), ou None em caso de erro
         """
         try:
-            feedbacks = self.get_all_feedback()
-            
-            if not feedbacks:
-                logger.warning("Nenhum feedback para exportar")
-                return None
-            
-            # Converter para DataFrame
-            df = pd.DataFrame(feedbacks)
+            # Garantir que os feedbacks em buffer entrem na exportação
+            self._flush()
             
             # Definir caminho de saída se não for especificado
             if output_path is None:
                 output_path = os.path.join(self.feedback_dir, f'feedback_export_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
             
-            # Exportar para CSV
-            df.to_csv(output_path, index=False, encoding='utf-8')
+            if shards > 1:
+                return self._export_shards(output_path, shards)
+            
+            # Exportar para CSV linha a linha, sem carregar todos os feedbacks em memória
+            if not self._write_csv(output_path):
+                os.remove(output_path)
+                logger.warning("Nenhum feedback para exportar")
+                return None
             
             logger.info(f"Feedbacks exportados para {output_path}")
             return output_path
@@ -178,11 +698,55 @@ class FeedbackManager:
         except Exception as e:
             logger.error(f"Erro ao exportar feedbacks: {e}")
             return None
+    
+    def _export_shards(self, output_path, shards):
+        """
+        Exporta os feedbacks em vários arquivos CSV gravados em paralelo.
+        
+        Args:
+            output_path (str): Caminho base dos arquivos CSV de saída
+            shards (int): Quantidade de arquivos a gerar
+            
+        Returns:
+            list: Caminhos dos arquivos gerados, ou None se não houver feedbacks
+        """
+        base, ext = os.path.splitext(output_path)
+        segments = self._shard_ranges(shards)
+        paths = [f"{base}_part{i}{ext or '.csv'}" for i in range(1, len(segments) + 1)]
+        
+        with ThreadPoolExecutor(max_workers=min(shards, len(segments)) or 1) as executor:
+            counts = list(executor.map(
+                lambda job: self._write_csv(job[0], [job[1]]),
+                zip(paths, segments)
+            ))
+        
+        # Descartar partes sem feedbacks (ex.: apenas linhas inválidas)
+        exported_paths = []
+        for path, count in zip(paths, counts):
+            if count:
+                exported_paths.append(path)
+            else:
+                os.remove(path)
+        
+        if not exported_paths:
+            logger.warning("Nenhum feedback para exportar")
+            return None
+        
+        logger.info(f"Feedbacks exportados para {len(exported_paths)} arquivos: {base}_part*")
+        return exported_paths
+
+@_cache_resource
+def _shared_feedback_manager(feedback_dir):
+    """Instância única do gerenciador por diretório de feedback."""
+    return FeedbackManager(feedback_dir)
 
 # Função para criar uma instância do gerenciador de feedback
 def create_feedback_manager(feedback_dir=None):
     """
-    Cria uma instância do gerenciador de feedback.
+    Obtém o gerenciador de feedback do diretório, compartilhado pelo processo.
+    
+    Uma única instância por diretório mantém buffer e contadores coerentes
+    entre as sessões e reexecuções do Streamlit.
     
     Args:
         feedback_dir (str): Diretório para armazenar os feedbacks
@@ -190,4 +754,4 @@ def create_feedback_manager(feedback_dir=None):
     Returns:
         FeedbackManager: Instância do gerenciador de feedback
     """
-    return FeedbackManager(feedback_dir)
+    return _shared_feedback_manager(os.path.abspath(feedback_dir or DEFAULT_FEEDBACK_DIR))
@@ -6,14 +6,27 @@ de processamento do agente RAG de forma semelhante ao n8n.
 """
 
 import streamlit as st
-import networkx as nx
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.patches as mpatches
-from matplotlib.path import Path
+# Figura e canvas Agg usados diretamente: sem pyplot, nenhum backend de GUI é carregado
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import io
-import base64
-from PIL import Image
-import numpy as np
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Imagem do fluxo persistida entre execuções (o grafo é estático)
+FLOW_IMAGE_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'data',
+    'cache',
+    'rag_flow.svg'
+)
+
+# HTML da imagem do fluxo, gerado uma única vez por processo
+_CACHED_HTML = None
 
 # Definir cores para os diferentes tipos de nós
 NODE_COLORS = {
@@ -24,177 +37,162 @@ NODE_COLORS = {
     'output': '#cc99ff'    # Roxo claro
 }
 
-def create_rag_flow_graph():
-    """
-    Cria um grafo NetworkX representando o fluxo do agente RAG.
+# Nós do fluxo e seus tipos
+_NODES = {
+    # Ingestão de Dados
+    'pdf_docs': {'type': 'input', 'label': 'Documentos PDF'},
+    'pdf_extractor': {'type': 'process', 'label': 'Extrator PDF\n(poppler-utils)'},
+    'raw_text': {'type': 'storage', 'label': 'Texto Bruto'},
+    'metadata_extractor': {'type': 'process', 'label': 'Extrator de\nMetadados'},
+    'diretrizes': {'type': 'input', 'label': 'Diretrizes\nde Produto'},
     
-    Returns:
-        G (nx.DiGraph): Grafo direcionado representando o fluxo
-        pos (dict): Posições dos nós para visualização
-        node_colors (list): Cores dos nós
-        node_types (dict): Tipos de cada nó
-    """
-    # Criar grafo direcionado
-    G = nx.DiGraph()
-    
-    # Definir nós e seus tipos
-    nodes = {
-        # Ingestão de Dados
-        'pdf_docs': {'type': 'input', 'label': 'Documentos PDF'},
-        'pdf_extractor': {'type': 'process', 'label': 'Extrator PDF\n(poppler-utils)'},
-        'raw_text': {'type': 'storage', 'label': 'Texto Bruto'},
-        'metadata_extractor': {'type': 'process', 'label': 'Extrator de\nMetadados'},
-        'diretrizes': {'type': 'input', 'label': 'Diretrizes\nde Produto'},
-        
-        # Chunking e Processamento
-        'chunker': {'type': 'process', 'label': 'Chunker\n(data_ingestion.py)'},
-        'chunks': {'type': 'storage', 'label': 'Chunks\nde Texto'},
-        'metadata_enricher': {'type': 'process', 'label': 'Enriquecedor\nde Metadados'},
-        'json_serializer': {'type': 'process', 'label': 'Serializador\nJSON'},
-        'processed_docs': {'type': 'storage', 'label': 'Documentos\nProcessados'},
-        
-        # Indexação Vetorial
-        'schema_creator': {'type': 'process', 'label': 'Criador de\nSchema Weaviate'},
-        'batch_indexer': {'type': 'process', 'label': 'Indexador\nem Lote'},
-        'openai_embeddings': {'type': 'api', 'label': 'API de\nEmbeddings OpenAI'},
-        'weaviate_db': {'type': 'storage', 'label': 'Base Vetorial\nWeaviate'},
-        
-        # Recuperação e Geração
-        'user_query': {'type': 'input', 'label': 'Consulta\ndo Usuário'},
-        'semantic_search': {'type': 'process', 'label': 'Busca\nSemântica'},
-        'relevant_docs': {'type': 'storage', 'label': 'Documentos\nRelevantes'},
-        'prompt_builder': {'type': 'process', 'label': 'Construtor\nde Prompt'},
-        'openai_llm': {'type': 'api', 'label': 'LLM GPT-4o\n(OpenAI API)'},
-        'generated_response': {'type': 'output', 'label': 'Resposta\nGerada'},
-        
-        # Interface do Usuário
-        'streamlit_form': {'type': 'process', 'label': 'Formulário\nStreamlit'},
-        'response_display': {'type': 'output', 'label': 'Exibição\nde Resposta'},
-        'sources_display': {'type': 'output', 'label': 'Visualização\nde Fontes'},
-        'feedback_system': {'type': 'process', 'label': 'Sistema de\nFeedback'}
-    }
-    
-    # Adicionar nós ao grafo
-    for node_id, attrs in nodes.items():
-        G.add_node(node_id, **attrs)
-    
-    # Definir arestas (conexões entre nós)
-    edges = [
-        # Ingestão de Dados
-        ('pdf_docs', 'pdf_extractor'),
-        ('pdf_extractor', 'raw_text'),
-        ('raw_text', 'metadata_extractor'),
-        ('metadata_extractor', 'processed_docs'),
-        ('diretrizes', 'prompt_builder'),
-        
-        # Chunking e Processamento
-        ('processed_docs', 'chunker'),
-        ('chunker', 'chunks'),
-        ('chunks', 'metadata_enricher'),
-        ('metadata_enricher', 'json_serializer'),
-        ('json_serializer', 'processed_docs'),
-        
-        # Indexação Vetorial
-        ('processed_docs', 'schema_creator'),
-        ('schema_creator', 'batch_indexer'),
-        ('batch_indexer', 'openai_embeddings'),
-        ('openai_embeddings', 'weaviate_db'),
-        
-        # Recuperação e Geração
-        ('user_query', 'streamlit_form'),
-        ('streamlit_form', 'semantic_search'),
-        ('weaviate_db', 'semantic_search'),
-        ('semantic_search', 'relevant_docs'),
-        ('relevant_docs', 'prompt_builder'),
-        ('prompt_builder', 'openai_llm'),
-        ('openai_llm', 'generated_response'),
-        
-        # Interface do Usuário
-        ('generated_response', 'response_display'),
-        ('relevant_docs', 'sources_display'),
-        ('response_display', 'feedback_system')
-    ]
+    # Chunking e Processamento
+    'chunker': {'type': 'process', 'label': 'Chunker\n(data_ingestion.py)'},
+    'chunks': {'type': 'storage', 'label': 'Chunks\nde Texto'},
+    'metadata_enricher': {'type': 'process', 'label': 'Enriquecedor\nde Metadados'},
+    'json_serializer': {'type': 'process', 'label': 'Serializador\nJSON'},
+    'processed_docs': {'type': 'storage', 'label': 'Documentos\nProcessados'},
     
-    # Adicionar arestas ao grafo
-    for source, target in edges:
-        G.add_edge(source, target)
+    # Indexação Vetorial
+    'schema_creator': {'type': 'process', 'label': 'Criador de\nSchema Weaviate'},
+    'batch_indexer': {'type': 'process', 'label': 'Indexador\nem Lote'},
+    'openai_embeddings': {'type': 'api', 'label': 'API de\nEmbeddings OpenAI'},
+    'weaviate_db': {'type': 'storage', 'label': 'Base Vetorial\nWeaviate'},
     
-    # Definir layout em camadas para visualização semelhante ao n8n
-    pos = {
-        # Ingestão de Dados (Camada 1)
-        'pdf_docs': (0, 10),
-        'diretrizes': (0, 6),
-        
-        # Processamento Inicial (Camada 2)
-        'pdf_extractor': (2, 10),
-        
-        # Resultados Iniciais (Camada 3)
-        'raw_text': (4, 10),
-        'metadata_extractor': (6, 10),
-        
-        # Processamento de Chunks (Camada 4)
-        'processed_docs': (8, 10),
-        'chunker': (10, 10),
-        
-        # Resultados de Chunks (Camada 5)
-        'chunks': (12, 10),
-        'metadata_enricher': (14, 10),
-        'json_serializer': (16, 10),
-        
-        # Indexação (Camada 6)
-        'schema_creator': (8, 8),
-        'batch_indexer': (10, 8),
-        'openai_embeddings': (12, 8),
-        'weaviate_db': (14, 8),
-        
-        # Consulta do Usuário (Camada 7)
-        'user_query': (0, 4),
-        'streamlit_form': (2, 4),
-        
-        # Recuperação (Camada 8)
-        'semantic_search': (14, 6),
-        'relevant_docs': (16, 6),
-        
-        # Geração (Camada 9)
-        'prompt_builder': (18, 6),
-        'openai_llm': (20, 6),
-        'generated_response': (22, 6),
-        
-        # Interface (Camada 10)
-        'response_display': (22, 4),
-        'sources_display': (22, 2),
-        'feedback_system': (24, 3)
-    }
+    # Recuperação e Geração
+    'user_query': {'type': 'input', 'label': 'Consulta\ndo Usuário'},
+    'semantic_search': {'type': 'process', 'label': 'Busca\nSemântica'},
+    'relevant_docs': {'type': 'storage', 'label': 'Documentos\nRelevantes'},
+    'prompt_builder': {'type': 'process', 'label': 'Construtor\nde Prompt'},
+    'openai_llm': {'type': 'api', 'label': 'LLM GPT-4o\n(OpenAI API)'},
+    'generated_response': {'type': 'output', 'label': 'Resposta\nGerada'},
+    
+    # Interface do Usuário
+    'streamlit_form': {'type': 'process', 'label': 'Formulário\nStreamlit'},
+    'response_display': {'type': 'output', 'label': 'Exibição\nde Resposta'},
+    'sources_display': {'type': 'output', 'label': 'Visualização\nde Fontes'},
+    'feedback_system': {'type': 'process', 'label': 'Sistema de\nFeedback'}
+}
+
+# Arestas (conexões entre nós)
+_EDGES = [
+    # Ingestão de Dados
+    ('pdf_docs', 'pdf_extractor'),
+    ('pdf_extractor', 'raw_text'),
+    ('raw_text', 'metadata_extractor'),
+    ('metadata_extractor', 'processed_docs'),
+    ('diretrizes', 'prompt_builder'),
+    
+    # Chunking e Processamento
+    ('processed_docs', 'chunker'),
+    ('chunker', 'chunks'),
+    ('chunks', 'metadata_enricher'),
+    ('metadata_enricher', 'json_serializer'),
+    ('json_serializer', 'processed_docs'),
+    
+    # Indexação Vetorial
+    ('processed_docs', 'schema_creator'),
+    ('schema_creator', 'batch_indexer'),
+    ('batch_indexer', 'openai_embeddings'),
+    ('openai_embeddings', 'weaviate_db'),
     
-    # Extrair cores dos nós com base em seus tipos
-    node_colors = [NODE_COLORS[nodes[node]['type']] for node in G.nodes()]
+    # Recuperação e Geração
+    ('user_query', 'streamlit_form'),
+    ('streamlit_form', 'semantic_search'),
+    ('weaviate_db', 'semantic_search'),
+    ('semantic_search', 'relevant_docs'),
+    ('relevant_docs', 'prompt_builder'),
+    ('prompt_builder', 'openai_llm'),
+    ('openai_llm', 'generated_response'),
     
-    # Criar dicionário de tipos de nós
-    node_types = {node: attrs['type'] for node, attrs in nodes.items()}
+    # Interface do Usuário
+    ('generated_response', 'response_display'),
+    ('relevant_docs', 'sources_display'),
+    ('response_display', 'feedback_system')
+]
+
+# Layout em camadas para visualização semelhante ao n8n
+_POS = {
+    # Ingestão de Dados (Camada 1)
+    'pdf_docs': (0, 10),
+    'diretrizes': (0, 6),
+    
+    # Processamento Inicial (Camada 2)
+    'pdf_extractor': (2, 10),
+    
+    # Resultados Iniciais (Camada 3)
+    'raw_text': (4, 10),
+    'metadata_extractor': (6, 10),
+    
+    # Processamento de Chunks (Camada 4)
+    'processed_docs': (8, 10),
+    'chunker': (10, 10),
+    
+    # Resultados de Chunks (Camada 5)
+    'chunks': (12, 10),
+    'metadata_enricher': (14, 10),
+    'json_serializer': (16, 10),
+    
+    # Indexação (Camada 6)
+    'schema_creator': (8, 8),
+    'batch_indexer': (10, 8),
+    'openai_embeddings': (12, 8),
+    'weaviate_db': (14, 8),
+    
+    # Consulta do Usuário (Camada 7)
+    'user_query': (0, 4),
+    'streamlit_form': (2, 4),
+    
+    # Recuperação (Camada 8)
+    'semantic_search': (14, 6),
+    'relevant_docs': (16, 6),
     
-    return G, pos, node_colors, node_types
+    # Geração (Camada 9)
+    'prompt_builder': (18, 6),
+    'openai_llm': (20, 6),
+    'generated_response': (22, 6),
+    
+    # Interface (Camada 10)
+    'response_display': (22, 4),
+    'sources_display': (22, 2),
+    'feedback_system': (24, 3)
+}
 
-def draw_rag_flow(G, pos, node_colors, node_types, figsize=(20, 10)):
+def create_rag_flow_graph():
+    """
+    Retorna a definição do fluxo do agente RAG.
+    
+    O grafo é pequeno e fixo, então é mantido em dicionários e listas simples
+    compartilhados; não devem ser modificados pelo chamador.
+    
+    Returns:
+        nodes (dict): Atributos ('type' e 'label') de cada nó
+        edges (list): Arestas (origem, destino)
+        pos (dict): Posições dos nós para visualização
+    """
+    return _NODES, _EDGES, _POS
+
+def draw_rag_flow(nodes, edges, pos, figsize=(20, 10)):
     """
     Desenha o grafo do fluxo RAG em estilo n8n.
     
     Args:
-        G (nx.DiGraph): Grafo direcionado representando o fluxo
+        nodes (dict): Atributos ('type' e 'label') de cada nó
+        edges (list): Arestas (origem, destino)
         pos (dict): Posições dos nós para visualização
-        node_colors (list): Cores dos nós
-        node_types (dict): Tipos de cada nó
         figsize (tuple): Tamanho da figura
         
     Returns:
-        bytes: Imagem em formato PNG como bytes
+        io.BytesIO: Imagem em formato SVG
     """
     # Criar figura
-    fig, ax = plt.subplots(figsize=figsize)
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
     
     # Desenhar nós com bordas arredondadas e cores específicas
     for node, (x, y) in pos.items():
-        node_type = node_types[node]
-        color = NODE_COLORS[node_type]
+        color = NODE_COLORS[nodes[node]['type']]
         
         # Criar retângulo arredondado
         rect = mpatches.FancyBboxPatch(
@@ -205,11 +203,11 @@ def draw_rag_flow(G, pos, node_colors, node_types, figsize=(20, 10)):
         ax.add_patch(rect)
         
         # Adicionar texto do nó
-        label = G.nodes[node]['label']
+        label = nodes[node]['label']
         ax.text(x, y, label, ha='center', va='center', fontsize=9, fontweight='bold')
     
     # Desenhar arestas com setas (versão simplificada compatível)
-    for u, v in G.edges():
+    for u, v in edges:
         # Obter posições dos nós
         x1, y1 = pos[u]
         x2, y2 = pos[v]
@@ -238,41 +236,77 @@ def draw_rag_flow(G, pos, node_colors, node_types, figsize=(20, 10)):
     ax.axis('off')
     
     # Adicionar título
-    plt.title('Fluxo de Processamento do Agente RAG', fontsize=16, pad=20)
+    ax.set_title('Fluxo de Processamento do Agente RAG', fontsize=16, pad=20)
     
-    # Salvar figura em bytes
+    # Salvar figura como SVG vetorial, mantendo os rótulos como texto
     buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-    plt.close(fig)
+    with matplotlib.rc_context({'svg.fonttype': 'none'}):
+        fig.savefig(buf, format='svg', bbox_inches='tight')
     buf.seek(0)
     
     return buf
 
+def load_flow_image():
+    """
+    Obtém o SVG do fluxo RAG, usando a cópia em disco quando válida.
+    
+    A cópia em disco é descartada se for mais antiga que este módulo, onde o
+    grafo é definido.
+    
+    Returns:
+        str: Elemento <svg> da imagem, sem o cabeçalho XML
+    """
+    try:
+        if os.path.getmtime(FLOW_IMAGE_CACHE_PATH) >= os.path.getmtime(__file__):
+            with open(FLOW_IMAGE_CACHE_PATH, 'r', encoding='utf-8') as f:
+                return f.read()
+    except OSError:
+        pass
+    
+    # Criar e desenhar grafo
+    nodes, edges, pos = create_rag_flow_graph()
+    svg = draw_rag_flow(nodes, edges, pos).read().decode('utf-8')
+    
+    # Descartar declaração XML e DOCTYPE, inválidos dentro do HTML
+    svg = svg[svg.index('<svg'):]
+    
+    # Persistir para as próximas execuções
+    try:
+        os.makedirs(os.path.dirname(FLOW_IMAGE_CACHE_PATH), exist_ok=True)
+        temp_path = FLOW_IMAGE_CACHE_PATH + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(svg)
+        os.replace(temp_path, FLOW_IMAGE_CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"Não foi possível salvar a imagem do fluxo em cache: {e}")
+    
+    return svg
+
 def get_flow_image_html():
     """
     Gera o HTML para exibir a imagem do fluxo RAG.
     
+    O HTML é gerado uma única vez por processo e reutilizado nas reexecuções.
+    
     Returns:
         str: HTML para exibir a imagem
     """
-    # Criar grafo
-    G, pos, node_colors, node_types = create_rag_flow_graph()
-    
-    # Desenhar grafo
-    img_bytes = draw_rag_flow(G, pos, node_colors, node_types)
-    
-    # Converter para base64
-    img_str = base64.b64encode(img_bytes.read()).decode('utf-8')
-    
-    # Criar HTML
-    html = f"""
-    <div style="display: flex; justify-content: center; margin: 20px 0;">
-        <img src="data:image/png;base64,{img_str}" 
-             alt="Fluxo de Processamento do Agente RAG" 
-             style="max-width: 100%; border-radius: 10px; box-shadow: 0 4px 8px rgba(0,0,0,0.1);">
-    </div>
-    """
+    global _CACHED_HTML
+    if _CACHED_HTML is not None:
+        return _CACHED_HTML
+    
+    # Incorporar o SVG diretamente, sem codificação base64. O HTML não pode ter
+    # indentação nem linhas em branco, ou o Markdown o trataria como texto.
+    svg = load_flow_image().replace('<svg ', '<svg style="max-width: 100%; height: auto;" ', 1)
+    svg = "\n".join(line for line in svg.splitlines() if line.strip())
+    html = (
+        '<div style="display: flex; justify-content: center; margin: 20px 0;" '
+        'role="img" aria-label="Fluxo de Processamento do Agente RAG">'
+        '<div style="max-width: 100%; border-radius: 10px; box-shadow: 0 4px 8px rgba(0,0,0,0.1); overflow: hidden;">'
+        f'{svg}</div></div>'
+    )
     
+    _CACHED_HTML = html
     return html
 
 def display_flow_visualization():
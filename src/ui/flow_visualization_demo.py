@@ -18,9 +18,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Adicionar CSS personalizado
-def load_css():
-    st.markdown("""
+# CSS personalizado, compactado uma única vez na importação do módulo
+_CSS_BLOCK = " ".join("""
     <style>
     .main-header {
         font-size: 2rem;
@@ -73,37 +72,50 @@ def load_css():
         min-width: 150px;
     }
     </style>
-    """, unsafe_allow_html=True)
+""".split())
+
+# Adicionar CSS personalizado
+def load_css():
+    # O Streamlit descarta elementos não renderizados no rerun, então o
+    # bloco precisa ser reenviado a cada execução do script
+    st.markdown(_CSS_BLOCK, unsafe_allow_html=True)
 
 load_css()
 
-# Dados mockados para o fluxo
-mock_data = {
-    "pdf_docs": {"status": "waiting", "time": 0, "data": "2 documentos PDF"},
-    "pdf_extractor": {"status": "waiting", "time": 0, "data": ""},
-    "raw_text": {"status": "waiting", "time": 0, "data": ""},
-    "metadata_extractor": {"status": "waiting", "time": 0, "data": ""},
-    "diretrizes": {"status": "waiting", "time": 0, "data": "Diretrizes de produto carregadas"},
-    "processed_docs": {"status": "waiting", "time": 0, "data": ""},
-    "chunker": {"status": "waiting", "time": 0, "data": ""},
-    "chunks": {"status": "waiting", "time": 0, "data": ""},
-    "metadata_enricher": {"status": "waiting", "time": 0, "data": ""},
-    "json_serializer": {"status": "waiting", "time": 0, "data": ""},
-    "schema_creator": {"status": "waiting", "time": 0, "data": ""},
-    "batch_indexer": {"status": "waiting", "time": 0, "data": ""},
-    "openai_embeddings": {"status": "waiting", "time": 0, "data": ""},
-    "weaviate_db": {"status": "waiting", "time": 0, "data": ""},
-    "user_query": {"status": "waiting", "time": 0, "data": ""},
-    "streamlit_form": {"status": "waiting", "time": 0, "data": ""},
-    "semantic_search": {"status": "waiting", "time": 0, "data": ""},
-    "relevant_docs": {"status": "waiting", "time": 0, "data": ""},
-    "prompt_builder": {"status": "waiting", "time": 0, "data": ""},
-    "openai_llm": {"status": "waiting", "time": 0, "data": ""},
-    "generated_response": {"status": "waiting", "time": 0, "data": ""},
-    "response_display": {"status": "waiting", "time": 0, "data": ""},
-    "sources_display": {"status": "waiting", "time": 0, "data": ""},
-    "feedback_system": {"status": "waiting", "time": 0, "data": ""}
+# st.fragment reexecuta apenas a função decorada em vez do script inteiro;
+# versões antigas do Streamlit só têm a variante experimental (ou nenhuma)
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+# Dados mockados para o fluxo, um dicionário por campo (status, tempo e
+# dados de cada nó) para evitar o dicionário aninhado por nó
+mock_node_data = {
+    "pdf_docs": "2 documentos PDF",
+    "pdf_extractor": "",
+    "raw_text": "",
+    "metadata_extractor": "",
+    "diretrizes": "Diretrizes de produto carregadas",
+    "processed_docs": "",
+    "chunker": "",
+    "chunks": "",
+    "metadata_enricher": "",
+    "json_serializer": "",
+    "schema_creator": "",
+    "batch_indexer": "",
+    "openai_embeddings": "",
+    "weaviate_db": "",
+    "user_query": "",
+    "streamlit_form": "",
+    "semantic_search": "",
+    "relevant_docs": "",
+    "prompt_builder": "",
+    "openai_llm": "",
+    "generated_response": "",
+    "response_display": "",
+    "sources_display": "",
+    "feedback_system": ""
 }
+mock_status = {node: "waiting" for node in mock_node_data}
+mock_times = {node: 0 for node in mock_node_data}
 
 # Sequência de processamento para simulação
 processing_sequence = [
@@ -133,6 +145,47 @@ processing_sequence = [
     "feedback_system"
 ]
 
+# Agrupamento dos nós por etapa, usado na tabela de status
+NODE_GROUPS = (
+    ("Ingestão de Dados", ("pdf_docs", "pdf_extractor", "raw_text", "metadata_extractor", "diretrizes")),
+    ("Chunking e Processamento", ("processed_docs", "chunker", "chunks", "metadata_enricher", "json_serializer")),
+    ("Indexação Vetorial", ("schema_creator", "batch_indexer", "openai_embeddings", "weaviate_db")),
+    ("Recuperação e Geração", ("user_query", "streamlit_form", "semantic_search", "relevant_docs", "prompt_builder", "openai_llm", "generated_response")),
+    ("Interface do Usuário", ("response_display", "sources_display", "feedback_system"))
+)
+
+# Classe CSS de cada status
+STATUS_CLASSES = {
+    "active": "node-active",
+    "completed": "node-completed",
+    "waiting": "node-waiting"
+}
+
+# Nome legível de cada nó, calculado uma única vez
+NODE_DISPLAY = {node: node.replace("_", " ").title() for node in mock_node_data}
+
+# Cabeçalhos dos grupos e linhas da tabela de status, com apenas a classe
+# do status e os dados do nó a preencher a cada quadro
+ROW_TEMPLATES = tuple(
+    (
+        f"""
+        <tr>
+            <td colspan="2" style="background-color:#f0f0f0; padding:5px; font-weight:bold;">{group_name}</td>
+        </tr>
+        """,
+        tuple(
+            (node, f"""
+            <tr>
+                <td style="padding:5px;"><span class="{{status_class}}">{NODE_DISPLAY[node]}</span></td>
+                <td style="padding:5px;">{{data}}</td>
+            </tr>
+            """)
+            for node in nodes
+        )
+    )
+    for group_name, nodes in NODE_GROUPS
+)
+
 # Dados mockados para métricas
 mock_metrics = {
     "total_docs": 2,
@@ -144,76 +197,69 @@ mock_metrics = {
     "total_time": 0
 }
 
+# Valores das métricas no início de cada simulação
+METRICS_RESET = {
+    "total_chunks": 0,
+    "tokens_used": 0,
+    "processing_time": 0,
+    "retrieval_time": 0,
+    "generation_time": 0,
+    "total_time": 0
+}
+
 # Função para simular o processamento
+@_fragment
 def simulate_processing():
     # Resetar dados
-    for node in mock_data:
-        mock_data[node]["status"] = "waiting"
-        mock_data[node]["time"] = 0
+    mock_status.update(dict.fromkeys(mock_status, "waiting"))
+    mock_times.update(dict.fromkeys(mock_times, 0))
     
     # Resetar métricas
-    mock_metrics["total_chunks"] = 0
-    mock_metrics["tokens_used"] = 0
-    mock_metrics["processing_time"] = 0
-    mock_metrics["retrieval_time"] = 0
-    mock_metrics["generation_time"] = 0
-    mock_metrics["total_time"] = 0
-    
-    # Placeholder para o status atual
-    status_placeholder = st.empty()
+    mock_metrics.update(METRICS_RESET)
     
-    # Placeholder para métricas
-    metrics_placeholder = st.empty()
-    
-    # Placeholder para detalhes do nó
-    node_details_placeholder = st.empty()
+    # Sortear de uma vez o tempo de processamento de cada nó
+    durations = [random.uniform(0.5, 2.0) for _ in processing_sequence]
     
     # Iniciar tempo total
     start_time = time.time()
     
-    # Processar cada nó na sequência
-    for i, node in enumerate(processing_sequence):
-        # Atualizar status para ativo
-        mock_data[node]["status"] = "active"
-        
-        # Exibir status atual
-        status_html = generate_status_html()
-        status_placeholder.markdown(status_html, unsafe_allow_html=True)
-        
-        # Simular tempo de processamento
-        process_time = random.uniform(0.5, 2.0)
-        time.sleep(process_time)
-        
-        # Atualizar tempo do nó
-        mock_data[node]["time"] = process_time
-        
-        # Atualizar dados mockados com base no nó
-        update_mock_data(node, process_time)
-        
-        # Atualizar métricas
-        update_metrics(node, process_time)
+    # Acompanhar o progresso em um bloco de status com barra de progresso e
+    # um placeholder único para status, métricas e detalhes do nó
+    with st.status("Processando...", expanded=True) as status:
+        progress = st.progress(0)
+        frame_placeholder = st.empty()
         
-        # Exibir métricas atualizadas
-        metrics_html = generate_metrics_html()
-        metrics_placeholder.markdown(metrics_html, unsafe_allow_html=True)
-        
-        # Exibir detalhes do nó atual
-        node_details_html = generate_node_details_html(node)
-        node_details_placeholder.markdown(node_details_html, unsafe_allow_html=True)
+        # Processar cada nó na sequência
+        for i, (node, process_time) in enumerate(zip(processing_sequence, durations)):
+            # Atualizar status para ativo
+            mock_status[node] = "active"
+            status.update(label=f"Processando: {NODE_DISPLAY[node]}")
+            
+            # Exibir quadro com o nó ativo (uma única escrita por passo)
+            frame_placeholder.markdown(generate_frame_html(node), unsafe_allow_html=True)
+            
+            # Simular tempo de processamento
+            time.sleep(process_time)
+            
+            # Atualizar tempo do nó
+            mock_times[node] = process_time
+            
+            # Atualizar dados mockados com base no nó
+            update_mock_data(node, process_time)
+            
+            # Atualizar métricas
+            update_metrics(node, process_time)
+            
+            # Atualizar status para concluído
+            mock_status[node] = "completed"
+            progress.progress((i + 1) / len(processing_sequence))
         
-        # Atualizar status para concluído
-        mock_data[node]["status"] = "completed"
+        # Atualizar tempo total
+        mock_metrics["total_time"] = time.time() - start_time
         
-        # Atualizar visualização de status
-        status_html = generate_status_html()
-        status_placeholder.markdown(status_html, unsafe_allow_html=True)
-    
-    # Atualizar tempo total
-    mock_metrics["total_time"] = time.time() - start_time
-    
-    # Exibir métricas finais
-    metrics_html = generate_metrics_html()
-    metrics_placeholder.markdown(metrics_html, unsafe_allow_html=True)
+        # Exibir quadro final com o último nó concluído e as métricas finais
+        status.update(label="Processamento concluído", state="complete")
+        frame_placeholder.markdown(generate_frame_html(processing_sequence[-1], "Concluído"), unsafe_allow_html=True)
     
     # Exibir mensagem de conclusão
     st.success("Processamento concluído com sucesso!")
@@ -221,56 +267,56 @@ def simulate_processing():
 # Função para atualizar dados mockados
 def update_mock_data(node, process_time):
     if node == "pdf_extractor":
-        mock_data[node]["data"] = "Extraindo texto de 2 PDFs"
+        mock_node_data[node] = "Extraindo texto de 2 PDFs"
     elif node == "raw_text":
-        mock_data[node]["data"] = "15.432 caracteres extraídos"
+        mock_node_data[node] = "15.432 caracteres extraídos"
     elif node == "metadata_extractor":
-        mock_data[node]["data"] = "Metadados: autor, data, título"
+        mock_node_data[node] = "Metadados: autor, data, título"
     elif node == "processed_docs":
-        mock_data[node]["data"] = "2 documentos processados"
+        mock_node_data[node] = "2 documentos processados"
     elif node == "chunker":
-        mock_data[node]["data"] = "Dividindo em chunks de 500 tokens"
+        mock_node_data[node] = "Dividindo em chunks de 500 tokens"
     elif node == "chunks":
         num_chunks = random.randint(20, 30)
-        mock_data[node]["data"] = f"{num_chunks} chunks gerados"
+        mock_node_data[node] = f"{num_chunks} chunks gerados"
         mock_metrics["total_chunks"] = num_chunks
     elif node == "metadata_enricher":
-        mock_data[node]["data"] = "Adicionando metadados aos chunks"
+        mock_node_data[node] = "Adicionando metadados aos chunks"
     elif node == "json_serializer":
-        mock_data[node]["data"] = "Serializando para JSON"
+        mock_node_data[node] = "Serializando para JSON"
     elif node == "schema_creator":
-        mock_data[node]["data"] = "Criando schema no Weaviate"
+        mock_node_data[node] = "Criando schema no Weaviate"
     elif node == "batch_indexer":
-        mock_data[node]["data"] = f"Indexando {mock_metrics['total_chunks']} chunks"
+        mock_node_data[node] = f"Indexando {mock_metrics['total_chunks']} chunks"
     elif node == "openai_embeddings":
         tokens = mock_metrics["total_chunks"] * random.randint(400, 600)
-        mock_data[node]["data"] = f"Gerando embeddings ({tokens} tokens)"
+        mock_node_data[node] = f"Gerando embeddings ({tokens} tokens)"
         mock_metrics["tokens_used"] += tokens
     elif node == "weaviate_db":
-        mock_data[node]["data"] = f"{mock_metrics['total_chunks']} vetores armazenados"
+        mock_node_data[node] = f"{mock_metrics['total_chunks']} vetores armazenados"
     elif node == "user_query":
-        mock_data[node]["data"] = "Consulta: 'Quais os perfis de usuários?'"
+        mock_node_data[node] = "Consulta: 'Quais os perfis de usuários?'"
     elif node == "streamlit_form":
-        mock_data[node]["data"] = "Processando formulário"
+        mock_node_data[node] = "Processando formulário"
     elif node == "semantic_search":
-        mock_data[node]["data"] = "Buscando documentos similares"
+        mock_node_data[node] = "Buscando documentos similares"
     elif node == "relevant_docs":
-        mock_data[node]["data"] = "3 documentos relevantes encontrados"
+        mock_node_data[node] = "3 documentos relevantes encontrados"
     elif node == "prompt_builder":
-        mock_data[node]["data"] = "Construindo prompt com contexto"
+        mock_node_data[node] = "Construindo prompt com contexto"
     elif node == "openai_llm":
         tokens_prompt = random.randint(1500, 2500)
         tokens_completion = random.randint(500, 1000)
-        mock_data[node]["data"] = f"Gerando resposta ({tokens_prompt} tokens entrada, {tokens_completion} tokens saída)"
+        mock_node_data[node] = f"Gerando resposta ({tokens_prompt} tokens entrada, {tokens_completion} tokens saída)"
         mock_metrics["tokens_used"] += (tokens_prompt + tokens_completion)
     elif node == "generated_response":
-        mock_data[node]["data"] = "Resposta gerada com 750 caracteres"
+        mock_node_data[node] = "Resposta gerada com 750 caracteres"
     elif node == "response_display":
-        mock_data[node]["data"] = "Exibindo resposta formatada"
+        mock_node_data[node] = "Exibindo resposta formatada"
     elif node == "sources_display":
-        mock_data[node]["data"] = "Exibindo 3 fontes utilizadas"
+        mock_node_data[node] = "Exibindo 3 fontes utilizadas"
     elif node == "feedback_system":
-        mock_data[node]["data"] = "Aguardando feedback do usuário"
+        mock_node_data[node] = "Aguardando feedback do usuário"
 
 # Função para atualizar métricas
 def update_metrics(node, process_time):
@@ -283,65 +329,35 @@ def update_metrics(node, process_time):
 
 # Função para gerar HTML do status atual
 def generate_status_html():
-    html = """
+    parts = ["""
     <div class="flow-container">
         <h3>Status do Processamento</h3>
         <table style="width:100%">
-    """
-    
-    # Agrupar nós por etapa
-    node_groups = {
-        "Ingestão de Dados": ["pdf_docs", "pdf_extractor", "raw_text", "metadata_extractor", "diretrizes"],
-        "Chunking e Processamento": ["processed_docs", "chunker", "chunks", "metadata_enricher", "json_serializer"],
-        "Indexação Vetorial": ["schema_creator", "batch_indexer", "openai_embeddings", "weaviate_db"],
-        "Recuperação e Geração": ["user_query", "streamlit_form", "semantic_search", "relevant_docs", "prompt_builder", "openai_llm", "generated_response"],
-        "Interface do Usuário": ["response_display", "sources_display", "feedback_system"]
-    }
+    """]
     
     # Adicionar cada grupo
-    for group_name, nodes in node_groups.items():
-        html += f"""
-        <tr>
-            <td colspan="2" style="background-color:#f0f0f0; padding:5px; font-weight:bold;">{group_name}</td>
-        </tr>
-        """
+    for group_header, rows in ROW_TEMPLATES:
+        parts.append(group_header)
         
-        for node in nodes:
-            # Obter dados do nó
-            node_data = mock_data[node]
-            status = node_data["status"]
-            
-            # Determinar classe CSS com base no status
-            if status == "active":
-                status_class = "node-active"
-            elif status == "completed":
-                status_class = "node-completed"
-            else:
-                status_class = "node-waiting"
-            
-            # Obter nome legível do nó
-            node_name = node.replace("_", " ").title()
-            
+        for node, row_template in rows:
             # Adicionar linha para o nó
-            html += f"""
-            <tr>
-                <td style="padding:5px;"><span class="{status_class}">{node_name}</span></td>
-                <td style="padding:5px;">{node_data["data"] if node_data["data"] else ""}</td>
-            </tr>
-            """
+            parts.append(row_template.format_map({
+                "status_class": STATUS_CLASSES.get(mock_status[node], "node-waiting"),
+                "data": mock_node_data[node]
+            }))
     
-    html += """
+    parts.append("""
         </table>
     </div>
-    """
+    """)
     
-    return html
+    return "".join(parts)
 
 # Função para gerar HTML das métricas
 def generate_metrics_html():
-    html = """
+    parts = ["""
     <div class="metrics-container">
-    """
+    """]
     
     # Adicionar cada métrica
     metrics = [
@@ -355,33 +371,30 @@ def generate_metrics_html():
     ]
     
     for metric in metrics:
-        html += f"""
+        parts.append(f"""
         <div class="metric-card">
             <div style="font-size:24px;">{metric["icon"]}</div>
             <div style="font-weight:bold;">{metric["name"]}</div>
             <div style="font-size:18px;">{metric["value"]}</div>
         </div>
-        """
+        """)
     
-    html += """
+    parts.append("""
     </div>
-    """
+    """)
     
-    return html
+    return "".join(parts)
 
 # Função para gerar HTML dos detalhes do nó atual
-def generate_node_details_html(node):
-    # Obter dados do nó
-    node_data = mock_data[node]
-    
+def generate_node_details_html(node, label="Processando"):
     # Obter nome legível do nó
-    node_name = node.replace("_", " ").title()
+    node_name = NODE_DISPLAY[node]
     
     html = f"""
     <div style="margin:20px 0; padding:15px; border:2px solid #ffcc00; border-radius:10px; background-color:#fffbf0;">
-        <h3>Processando: {node_name}</h3>
-        <p>Tempo estimado: {node_data["time"]:.2f}s</p>
-        <p>{node_data["data"]}</p>
+        <h3>{label}: {node_name}</h3>
+        <p>Tempo estimado: {mock_times[node]:.2f}s</p>
+        <p>{mock_node_data[node]}</p>
         <div style="width:100%; height:10px; background-color:#eee; border-radius:5px; margin-top:10px;">
             <div style="width:100%; height:10px; background-color:#ffcc00; border-radius:5px; animation: pulse 1s infinite;">
             </div>
@@ -391,6 +404,20 @@ def generate_node_details_html(node):
     
     return html
 
+# Função para gerar o HTML completo de um passo da simulação
+def generate_frame_html(node, label="Processando"):
+    """
+    Gera, em uma única string, o status, as métricas e os detalhes do nó.
+    
+    Args:
+        node (str): Nó em processamento
+        label (str): Rótulo exibido antes do nome do nó
+        
+    Returns:
+        str: HTML do quadro
+    """
+    return "".join((generate_status_html(), generate_metrics_html(), generate_node_details_html(node, label)))
+
 # Interface principal
 def main():
     st.title("Visualização do Fluxo do Agente RAG")
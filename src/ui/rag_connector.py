@@ -6,18 +6,49 @@ Este módulo fornece funções para conectar a interface Streamlit ao backend RA
 
 import os
 import sys
-import logging
-import weaviate
-from weaviate.auth import AuthApiKey
-from openai import OpenAI
+import functools
+from weaviate.exceptions import WeaviateBaseError
+from openai import OpenAI, OpenAIError
 import json
+from src.utils.logging_config import get_logger
+from src.utils.openai_safe import wrap_with_response_cache
+from src.rag.weaviate_integration import get_shared_client, invalidate_shared_client, embed_texts, HYBRID_ALPHA, HYBRID_QUERY_PROPERTIES
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+# Usar o cache de recursos do Streamlit apenas se ele já foi carregado pela
+# aplicação, como em feedback_manager
+_streamlit = sys.modules.get('streamlit')
+if _streamlit is not None:
+    _cache_resource = _streamlit.cache_resource(show_spinner=False)
+else:
+    _cache_resource = functools.lru_cache(maxsize=None)
+
+# Configuração de logging centralizada em utils.logging_config
+logger = get_logger(__name__)
+
+# Quantidade de caracteres das diretrizes incluída no prompt
+DIRETRIZES_PROMPT_CHARS = 2000
+
+# Quantidade de caracteres de cada documento recuperado usada como contexto
+DOCUMENT_CONTEXT_CHARS = 1000
+
+# Mensagem de sistema enviada ao modelo
+SYSTEM_PREAMBLE = "Você é um assistente especializado em ideação e discovery de produto."
+
+@functools.lru_cache(maxsize=4)
+def _load_diretrizes(path, mtime):
+    """
+    Lê o arquivo de diretrizes. O cache é indexado também pela data de
+    modificação, então alterações no arquivo são relidas.
+    
+    Args:
+        path (str): Caminho para o arquivo de diretrizes
+        mtime (float): Data de modificação do arquivo
+        
+    Returns:
+        str: Conteúdo do arquivo
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
 
 class RAGConnector:
     """
@@ -39,52 +70,45 @@ class RAGConnector:
         self.openai_api_key = openai_api_key
         self.diretrizes_path = diretrizes_path
         
+        # Cliente OpenAI criado uma única vez e reutilizado entre consultas
+        self.openai_client = None
+        try:
+            self._get_openai_client()
+        except OpenAIError as e:
+            logger.error(f"Erro ao inicializar cliente OpenAI: {e}")
+        
         # Carregar diretrizes
         try:
-            with open(diretrizes_path, 'r', encoding='utf-8') as f:
-                self.diretrizes = f.read()
+            self.diretrizes = _load_diretrizes(diretrizes_path, os.path.getmtime(diretrizes_path))
             logger.info(f"Diretrizes carregadas de {diretrizes_path}")
         except Exception as e:
             logger.error(f"Erro ao carregar diretrizes: {e}")
             self.diretrizes = "Diretrizes não disponíveis."
+        
+        # Trecho das diretrizes usado no prompt, recortado uma única vez
+        self.diretrizes_prefix = self.diretrizes[:DIRETRIZES_PROMPT_CHARS]
+        self.system_preamble = SYSTEM_PREAMBLE
+        
+        # Mensagem de sistema com as diretrizes, montada uma única vez; por ser
+        # um prefixo fixo entre consultas, pode ser aproveitada pelo cache de
+        # prompts da OpenAI
+        self.system_message = f"{self.system_preamble}\n\nDIRETRIZES:\n{self.diretrizes_prefix}..."
     
     def connect_to_weaviate(self):
         """
-        Conecta ao Weaviate.
+        Obtém a conexão compartilhada com o Weaviate.
         
         Returns:
-            weaviate.Client: Cliente Weaviate conectado ou None em caso de erro
+            weaviate.WeaviateClient: Cliente Weaviate conectado ou None em caso de erro
         """
-        try:
-            # Configurar autenticação usando a API compatível
-            auth_config = None
-            if self.api_key:
-                auth_config = AuthApiKey(api_key=self.api_key)
-            
-            # Conectar ao Weaviate usando o construtor padrão (compatível com todas as versões)
-            client = weaviate.Client(
-                url=self.weaviate_url,
-                auth_client_secret=auth_config,
-                additional_headers={
-                    "X-OpenAI-Api-Key": self.openai_api_key
-                }
-            )
-            
-            # Verificar conexão
-            if not client.is_ready():
-                logger.error(f"Falha ao conectar com Weaviate: {self.weaviate_url}")
-                return None
-            
-            logger.info(f"Conexão estabelecida com Weaviate: {self.weaviate_url}")
-            return client
-            
-        except Exception as e:
-            logger.error(f"Erro ao conectar com Weaviate: {e}")
-            return None
+        return get_shared_client(self.weaviate_url, self.api_key)
     
     def search_documents(self, query, filters=None, limit=3):
         """
-        Realiza busca semântica no Weaviate.
+        Realiza busca híbrida (BM25 + vetorial) no Weaviate.
+        
+        A coleção não tem vectorizer: o vetor da consulta é gerado aqui, com o
+        mesmo modelo usado na indexação (ver weaviate_integration.embed_texts).
         
         Args:
             query (str): Consulta para busca semântica
@@ -100,27 +124,31 @@ class RAGConnector:
                 return []
             
             # Definir as propriedades a serem retornadas
-            properties = ["content", "tipo", "filename", "file_path"]
+            properties = ["content", "tipo", "filename"]
             
-            # Executar a consulta usando a API compatível
-            result = (
-                client.query
-                .get("Document", properties)
-                .with_near_text({"concepts": [query]})
-                .with_limit(limit)
-                .do()
+            # Vetorizar a consulta com o mesmo modelo usado na indexação
+            query_vector = embed_texts(self._get_openai_client(), [query])[0]
+            
+            # Executar a consulta híbrida usando a API v4
+            response = client.collections.get("Document").query.hybrid(
+                query=query,
+                vector=query_vector,
+                alpha=HYBRID_ALPHA,
+                query_properties=HYBRID_QUERY_PROPERTIES,
+                limit=limit,
+                return_properties=properties
             )
             
             # Extrair documentos do resultado
-            documents = result['data']['Get']['Document'] if 'data' in result and 'Get' in result['data'] and 'Document' in result['data']['Get'] else []
+            documents = [obj.properties for obj in response.objects]
             
             logger.info(f"Busca semântica retornou {len(documents)} resultados")
             
-            # Formatar resultados
+            # Formatar resultados, já recortando o conteúdo usado como contexto
             formatted_results = []
             for doc in documents:
                 formatted_results.append({
-                    "content": doc.get("content", ""),
+                    "content": doc.get("content", "")[:DOCUMENT_CONTEXT_CHARS],
                     "filename": doc.get("filename", ""),
                     "chunk_id": doc.get("chunk_id", ""),
                     "tipo": doc.get("tipo", "")
@@ -128,37 +156,44 @@ class RAGConnector:
             
             return formatted_results
                 
-        except Exception as e:
+        except WeaviateBaseError as e:
             logger.error(f"Erro ao realizar busca semântica: {e}")
+            # A falha pode ser da conexão; forçar nova verificação na próxima consulta
+            invalidate_shared_client(self.weaviate_url, self.api_key)
+            return []
+        except OpenAIError as e:
+            logger.error(f"Erro ao gerar o embedding da consulta: {e}")
             return []
     
-    def generate_response(self, query, results):
+    def _get_openai_client(self):
         """
-        Gera resposta usando o OpenAI GPT-4o.
+        Retorna o cliente OpenAI deste conector, criando-o na primeira chamada.
+        
+        Returns:
+            OpenAI: Cliente OpenAI
+        """
+        if self.openai_client is None:
+            # REMOVIDO PARÂMETRO PROXIES QUE CAUSAVA ERRO
+            self.openai_client = wrap_with_response_cache(OpenAI(api_key=self.openai_api_key))
+        return self.openai_client
+    
+    def _build_messages(self, query, results):
+        """
+        Monta as mensagens enviadas ao modelo a partir da consulta e do contexto.
         
         Args:
             query (str): Consulta do usuário
             results (list): Resultados da busca semântica
             
         Returns:
-            str: Resposta gerada ou mensagem de erro
+            list: Mensagens no formato da API de chat
         """
-        try:
-            # Inicializar cliente OpenAI - REMOVIDO PARÂMETRO PROXIES QUE CAUSAVA ERRO
-            openai_client = OpenAI(api_key=self.openai_api_key)
-            
-            # Preparar contexto para o prompt
-            context = ""
-            for i, result in enumerate(results):
-                context += f"\n\nDocumento {i+1}:\n{result['content'][:1000]}...\n"
-            
-            # Criar prompt com diretrizes e contexto
-            prompt = f"""
-            Você é um assistente especializado em ideação e discovery de produto.
-            
-            DIRETRIZES:
-            {self.diretrizes[:2000]}...
-            
+        # Preparar contexto para o prompt
+        context = "".join(f"\n\nDocumento {i+1}:\n{result['content']}...\n" for i, result in enumerate(results))
+        
+        # Criar prompt apenas com o contexto e a consulta; as diretrizes vão
+        # na mensagem de sistema
+        prompt = f"""
             CONTEXTO DOS DOCUMENTOS:
             {context}
             
@@ -167,69 +202,149 @@ class RAGConnector:
             
             Com base nas diretrizes e no contexto fornecido, responda à consulta do usuário de forma clara e concisa.
             """
+        
+        return [
+            {"role": "system", "content": self.system_message},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def generate_response(self, query, results):
+        """
+        Gera resposta usando o OpenAI GPT-4o.
+        
+        Args:
+            query (str): Consulta do usuário
+            results (list): Resultados da busca semântica
+            
+        Returns:
+            str: Resposta gerada ou mensagem de erro
+        """
+        try:
+            openai_client = self._get_openai_client()
             
             # Gerar resposta
             response = openai_client.chat.completions.create(
                 model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "Você é um assistente especializado em ideação e discovery de produto."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._build_messages(query, results),
                 temperature=0.7,
                 max_tokens=1000
             )
             
             return response.choices[0].message.content
             
-        except Exception as e:
+        except OpenAIError as e:
             logger.error(f"Erro ao gerar resposta: {e}")
             return f"Erro ao gerar resposta: {str(e)}"
     
-    def process_query(self, query, filters=None):
+    def stream_response(self, query, results):
         """
-        Processa uma consulta completa, realizando busca e gerando resposta.
+        Gera resposta usando o OpenAI GPT-4o, entregando o texto à medida que é produzido.
         
         Args:
             query (str): Consulta do usuário
-            filters (dict): Filtros opcionais
+            results (list): Resultados da busca semântica
             
-        Returns:
-            dict: Resultados da consulta
+        Yields:
+            str: Trechos da resposta gerada ou mensagem de erro
         """
         try:
-            # Realizar busca semântica
-            results = self.search_documents(query, filters)
+            openai_client = self._get_openai_client()
             
-            if not results:
-                return {
-                    "query": query,
-                    "results": [],
-                    "response": "Não foi possível encontrar informações relevantes para sua consulta. Por favor, tente reformular ou entre em contato com a equipe de suporte."
-                }
+            # Gerar resposta em streaming
+            stream = openai_client.chat.completions.create(
+                model="gpt-4o",
+                messages=self._build_messages(query, results),
+                temperature=0.7,
+                max_tokens=1000,
+                stream=True
+            )
             
-            # Gerar resposta
-            response = self.generate_response(query, results)
+            for chunk in stream:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ""
             
-            # Retornar resultados formatados
-            return {
-                "query": query,
-                "results": results,
-                "response": response
-            }
+        except OpenAIError as e:
+            logger.error(f"Erro ao gerar resposta: {e}")
+            yield f"Erro ao gerar resposta: {str(e)}"
+    
+    def process_query(self, query, filters=None, stream=False):
+        """
+        Processa uma consulta completa, realizando busca e gerando resposta.
+        
+        Falhas do Weaviate e da OpenAI são tratadas em search_documents e
+        generate_response; erros inesperados são propagados.
+        
+        Args:
+            query (str): Consulta do usuário
+            filters (dict): Filtros opcionais
+            stream (bool): Se True, "response" é um gerador de trechos da resposta
             
-        except Exception as e:
-            logger.error(f"Erro ao processar consulta: {e}")
+        Returns:
+            dict: Resultados da consulta
+        """
+        # Realizar busca semântica
+        results = self.search_documents(query, filters)
+        
+        if not results:
             return {
                 "query": query,
                 "results": [],
-                "response": f"Erro ao processar consulta: {str(e)}"
+                "response": "Não foi possível encontrar informações relevantes para sua consulta. Por favor, tente reformular ou entre em contato com a equipe de suporte."
             }
+        
+        # Gerar resposta
+        if stream:
+            response = self.stream_response(query, results)
+        else:
+            response = self.generate_response(query, results)
+        
+        # Retornar resultados formatados
+        return {
+            "query": query,
+            "results": results,
+            "response": response
+        }
+
+@_cache_resource
+def _shared_rag_connector(config_path):
+    """
+    Instância única do conector RAG por arquivo de configuração.
+    
+    Erros não são cacheados: a próxima chamada tenta criar o conector de novo.
+    
+    Args:
+        config_path (str): Caminho para o arquivo de configuração (opcional)
+        
+    Returns:
+        RAGConnector: Instância do conector RAG
+    """
+    # Tentar carregar configuração do arquivo
+    if config_path and os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+            
+        weaviate_url = config.get('weaviate_url')
+        api_key = config.get('api_key')
+        openai_api_key = config.get('openai_api_key')
+        diretrizes_path = config.get('diretrizes_path')
+    else:
+        # Usar variáveis de ambiente ou valores padrão
+        weaviate_url = os.environ.get('WEAVIATE_URL', '$WEAVIATE_URL')
+        api_key = os.environ.get('WEAVIATE_API_KEY', '$WEAVIATE_API_KEY')
+        openai_api_key = os.environ.get('OPENAI_API_KEY', '$OPENAI_API_KEY')
+        diretrizes_path = os.environ.get('DIRETRIZES_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'diretrizes_produto.md'))
+    
+    # Criar e retornar o conector
+    return RAGConnector(weaviate_url, api_key, openai_api_key, diretrizes_path)
 
 # Função para criar uma instância do conector RAG
 def create_rag_connector(config_path=None):
     """
     Cria uma instância do conector RAG com base em um arquivo de configuração ou variáveis de ambiente.
     
+    O conector é compartilhado entre as reexecuções do Streamlit, evitando
+    reler as diretrizes e a configuração a cada interação.
+    
     Args:
         config_path (str): Caminho para o arquivo de configuração (opcional)
         
@@ -237,24 +352,7 @@ def create_rag_connector(config_path=None):
         RAGConnector: Instância do conector RAG
     """
     try:
-        # Tentar carregar configuração do arquivo
-        if config_path and os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-                
-            weaviate_url = config.get('weaviate_url')
-            api_key = config.get('api_key')
-            openai_api_key = config.get('openai_api_key')
-            diretrizes_path = config.get('diretrizes_path')
-        else:
-            # Usar variáveis de ambiente ou valores padrão
-            weaviate_url = os.environ.get('WEAVIATE_URL', '$WEAVIATE_URL')
-            api_key = os.environ.get('WEAVIATE_API_KEY', '$WEAVIATE_API_KEY')
-            openai_api_key = os.environ.get('OPENAI_API_KEY', '$OPENAI_API_KEY')
-            diretrizes_path = os.environ.get('DIRETRIZES_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'diretrizes_produto.md'))
-        
-        # Criar e retornar o conector
-        return RAGConnector(weaviate_url, api_key, openai_api_key, diretrizes_path)
+        return _shared_rag_connector(config_path)
         
     except Exception as e:
         logger.error(f"Erro ao criar conector RAG: {e}")
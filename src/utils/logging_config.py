@@ -6,69 +6,78 @@ formato consistente e captura detalhada de informações para diagnóstico.
 """
 import os
 import sys
+import time
 import logging
 import json
-from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Union
+
+# orjson é bem mais rápido que o json da biblioteca padrão; usar se disponível
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configuração de níveis de log
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# Formato do timestamp dos logs estruturados (ISO 8601, sem frações)
+STRUCTURED_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
 # Configurar logger raiz
 root_logger = logging.getLogger()
 root_logger.setLevel(getattr(logging, LOG_LEVEL))
 
-# Limpar handlers existentes para evitar duplicação
-for handler in root_logger.handlers[:]:
-    root_logger.removeHandler(handler)
-
-# Adicionar handler para stdout
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
-root_logger.addHandler(console_handler)
+# Adicionar handler para stdout apenas se nenhum foi configurado, para que
+# importações repetidas não dupliquem a saída
+if not root_logger.handlers:
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+    root_logger.addHandler(console_handler)
 
 # Logger específico para este módulo
 logger = logging.getLogger(__name__)
 
-class StructuredLogRecord(logging.LogRecord):
-    """
-    Extensão de LogRecord para suportar logging estruturado.
-    """
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.structured_data = {}
-
 class StructuredLogger(logging.Logger):
     """
     Logger que suporta logging estruturado com metadados adicionais.
+    
+    Os registros são LogRecord comuns; as chaves de extra (incluindo
+    structured_data) são copiadas para o registro em makeRecord.
     """
     def makeRecord(self, name, level, fn, lno, msg, args, exc_info, func=None, extra=None, sinfo=None):
         """
-        Cria um registro de log estruturado.
+        Cria o registro de log e copia as chaves de extra para ele.
+        
+        Diferente do makeRecord padrão, chaves que coincidem com atributos do
+        LogRecord (message, args, name, ...) não geram KeyError no chamador.
         """
-        record = StructuredLogRecord(name, level, fn, lno, msg, args, exc_info, func, sinfo)
+        record = super().makeRecord(name, level, fn, lno, msg, args, exc_info, func, None, sinfo)
         if extra is not None:
             for key in extra:
-                if key == 'structured_data':
-                    record.structured_data = extra[key]
-                else:
-                    setattr(record, key, extra[key])
+                setattr(record, key, extra[key])
         return record
-
-    def structured_log(self, level: int, msg: str, structured_data: Dict[str, Any], *args, **kwargs):
+    
+    def structured_log(self, level: int, msg: str, structured_data: Union[Dict[str, Any], Callable[[], Dict[str, Any]]], *args, **kwargs):
         """
         Registra uma mensagem com dados estruturados adicionais.
         
+        Dados caros de montar podem ser passados como função, que só é chamada
+        se o nível estiver habilitado:
+        logger.structured_log(logging.DEBUG, "msg", lambda: expensive_snapshot())
+        
         Args:
             level: Nível de log (INFO, WARNING, ERROR, etc.)
             msg: Mensagem de log
-            structured_data: Dicionário com dados estruturados adicionais
+            structured_data: Dicionário com dados estruturados adicionais, ou função que o retorna
             *args, **kwargs: Argumentos adicionais para o logger
         """
         if not self.isEnabledFor(level):
             return
+        
+        if callable(structured_data):
+            structured_data = structured_data()
             
         if 'extra' not in kwargs:
             kwargs['extra'] = {}
@@ -80,12 +89,27 @@ class StructuredFormatter(logging.Formatter):
     """
     Formatador que inclui dados estruturados no formato JSON.
     """
+    # Último segundo formatado e sua representação, reaproveitados pelos
+    # registros emitidos no mesmo segundo
+    _cached_second = None
+    _cached_timestamp = ""
+    
+    def _timestamp(self, record):
+        """
+        Formata o instante do registro a partir de record.created.
+        """
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_timestamp = time.strftime(STRUCTURED_DATE_FORMAT, self.converter(second))
+            self._cached_second = second
+        return f"{self._cached_timestamp}.{int(record.msecs):03d}"
+    
     def format(self, record):
         """
         Formata o registro de log, incluindo dados estruturados.
         """
         log_data = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self._timestamp(record),
             'level': record.levelname,
             'name': record.name,
             'message': record.getMessage(),
@@ -103,6 +127,8 @@ class StructuredFormatter(logging.Formatter):
                 'traceback': self.formatException(record.exc_info)
             }
             
+        if orjson is not None:
+            return orjson.dumps(log_data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
         return json.dumps(log_data)
 
 def get_logger(name: str) -> StructuredLogger:
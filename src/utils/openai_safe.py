@@ -3,21 +3,77 @@ Módulo para criar um wrapper seguro para o cliente OpenAI
 Este módulo fornece uma função para criar um cliente OpenAI de forma simples.
 """
 import os
+import re
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
 import logging
+import threading
+from pathlib import Path
+from types import SimpleNamespace
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logger do módulo; a configuração do logging fica a cargo da aplicação
 logger = logging.getLogger(__name__)
 
-def create_safe_openai_client(api_key=None):
+__all__ = ['create_safe_openai_client', 'create_minimal_openai_client', 'CachedOpenAI', 'wrap_with_response_cache']
+
+# Cache em disco das respostas de chat e de embeddings, ativado com
+# OPENAI_CACHE=1; com OPENAI_CACHE_REFRESH=1 as respostas são sempre pedidas
+# à API e o cache é regravado
+OPENAI_CACHE_ENABLED = os.environ.get('OPENAI_CACHE') == '1'
+OPENAI_CACHE_REFRESH = os.environ.get('OPENAI_CACHE_REFRESH') == '1'
+OPENAI_CACHE_PATH = os.environ.get(
+    'OPENAI_CACHE_PATH',
+    str(Path(__file__).resolve().parents[2] / 'data' / 'cache' / 'openai_responses.sqlite')
+)
+OPENAI_CACHE_EXPIRE_SECONDS = 6 * 60 * 60
+
+# Parâmetros de proxy que causavam erro na criação do cliente; são sempre
+# removidos, mesmo que alguma versão do construtor os aceite
+_PROBLEMATIC_PARAMS = frozenset({'proxies', 'proxy', 'http_proxy', 'https_proxy', 'no_proxy'})
+
+# Clientes já criados, por chave de API e parâmetros adicionais; reutilizar o
+# cliente mantém o pool de conexões HTTP entre as chamadas
+_client_cache = {}
+_client_cache_lock = threading.Lock()
+
+_UNEXPECTED_KWARG_RE = re.compile(r"unexpected keyword argument '(\w+)'")
+
+def _construct_client(openai_cls, api_key, kwargs):
+    """
+    Instancia o cliente, descartando os parâmetros que o construtor recusar.
+    
+    Args:
+        openai_cls (type): Classe do cliente OpenAI
+        api_key (str): Chave da API OpenAI
+        kwargs (dict): Parâmetros adicionais; os recusados são removidos do dicionário
+        
+    Returns:
+        OpenAI: Cliente OpenAI
+    """
+    while True:
+        try:
+            return openai_cls(api_key=api_key, **kwargs)
+        except TypeError as e:
+            match = _UNEXPECTED_KWARG_RE.search(str(e))
+            if not match or match.group(1) not in kwargs:
+                raise
+            logger.warning(f"Parâmetro '{match.group(1)}' ignorado ao criar cliente OpenAI")
+            kwargs.pop(match.group(1))
+
+def create_safe_openai_client(api_key=None, **kwargs):
     """
     Cria um cliente OpenAI de forma simples.
     
+    O cliente é compartilhado entre as chamadas com a mesma chave e os
+    mesmos parâmetros.
+    
     Args:
         api_key (str, optional): Chave da API OpenAI. Se não fornecida, usa a variável de ambiente.
+        **kwargs: Parâmetros adicionais repassados ao construtor do cliente;
+            parâmetros que o construtor não aceita são descartados
         
     Returns:
         OpenAI: Cliente OpenAI configurado.
@@ -30,12 +86,134 @@ def create_safe_openai_client(api_key=None):
         if api_key is None:
             api_key = os.environ.get('OPENAI_API_KEY')
             
-        # Criar o cliente com configuração mínima
-        return OpenAI(api_key=api_key)
+        # Remover parâmetros de proxy problemáticos
+        for param in _PROBLEMATIC_PARAMS.intersection(kwargs):
+            logger.warning(f"Parâmetro '{param}' removido ao criar cliente OpenAI")
+            del kwargs[param]
+        
+        key = (api_key, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            # Parâmetros não hashable (ex.: dicionários de headers): não compartilhar
+            return wrap_with_response_cache(_construct_client(OpenAI, api_key, kwargs))
+            
+        with _client_cache_lock:
+            client = _client_cache.get(key)
+            if client is None:
+                # Criar o cliente com configuração mínima
+                client = wrap_with_response_cache(_construct_client(OpenAI, api_key, kwargs))
+                _client_cache[key] = client
+        return client
         
     except Exception as e:
         logger.error(f"Erro ao criar cliente OpenAI: {e}")
         raise
 
+class CachedOpenAI:
+    """
+    Cliente OpenAI com cache em disco das respostas de chat.completions.create
+    e embeddings.create.
+    
+    Requisições idênticas (mesmo endpoint, modelo, entrada e parâmetros) são
+    respondidas do cache enquanto não expiram. Chamadas em streaming e os
+    demais atributos do cliente são repassados sem cache.
+    """
+    
+    def __init__(self, client, cache_path=OPENAI_CACHE_PATH, expire_seconds=OPENAI_CACHE_EXPIRE_SECONDS, refresh=OPENAI_CACHE_REFRESH):
+        """
+        Inicializa o cliente com cache.
+        
+        Args:
+            client (OpenAI): Cliente OpenAI a ser envolvido
+            cache_path (str): Caminho do arquivo SQLite do cache
+            expire_seconds (int): Validade das respostas em cache, em segundos
+            refresh (bool): Se True, ignora as respostas em cache e as regrava
+        """
+        self._client = client
+        self._expire_seconds = expire_seconds
+        self._refresh = refresh
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, created REAL, response BLOB)")
+        self._db.commit()
+        
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat_completion))
+        self.embeddings = SimpleNamespace(create=self._create_embedding)
+    
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+    
+    def _create_chat_completion(self, **kwargs):
+        """
+        Executa chat.completions.create, usando o cache quando possível.
+        
+        Args:
+            **kwargs: Parâmetros da requisição
+            
+        Returns:
+            ChatCompletion: Resposta da API (ou do cache)
+        """
+        if kwargs.get('stream'):
+            return self._client.chat.completions.create(**kwargs)
+        return self._cached_call('chat.completions', self._client.chat.completions.create, kwargs)
+    
+    def _create_embedding(self, **kwargs):
+        """
+        Executa embeddings.create, usando o cache quando possível.
+        
+        Args:
+            **kwargs: Parâmetros da requisição
+            
+        Returns:
+            CreateEmbeddingResponse: Resposta da API (ou do cache)
+        """
+        return self._cached_call('embeddings', self._client.embeddings.create, kwargs)
+    
+    def _cached_call(self, endpoint, create, kwargs):
+        """
+        Retorna a resposta em cache da requisição ou a obtém da API e a guarda.
+        
+        Args:
+            endpoint (str): Nome do endpoint, parte da chave do cache
+            create (callable): Método do cliente que executa a requisição
+            kwargs (dict): Parâmetros da requisição
+            
+        Returns:
+            Any: Resposta da API (ou do cache)
+        """
+        payload = json.dumps([endpoint, kwargs], sort_keys=True, default=str)
+        key = hashlib.blake2b(payload.encode('utf-8')).hexdigest()
+        if not self._refresh:
+            with self._lock:
+                row = self._db.execute("SELECT created, response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and time.time() - row[0] < self._expire_seconds:
+                return pickle.loads(row[1])
+        
+        response = create(**kwargs)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, created, response) VALUES (?, ?, ?)",
+                (key, time.time(), pickle.dumps(response))
+            )
+            self._db.commit()
+        return response
+
+def wrap_with_response_cache(client):
+    """
+    Envolve o cliente com CachedOpenAI se o cache estiver ativado (OPENAI_CACHE=1).
+    
+    Args:
+        client (OpenAI): Cliente OpenAI
+        
+    Returns:
+        OpenAI | CachedOpenAI: Cliente com ou sem cache
+    """
+    if OPENAI_CACHE_ENABLED:
+        return CachedOpenAI(client)
+    return client
+
 # Função de compatibilidade para código existente
 create_minimal_openai_client = create_safe_openai_client
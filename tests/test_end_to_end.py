@@ -12,6 +12,7 @@ import logging
 import unittest
 import tempfile
 import shutil
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
 # Configurar logging
@@ -27,26 +28,64 @@ sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
 # Importar módulos a serem testados
 from ui.rag_connector import RAGConnector, create_rag_connector
 from ui.feedback_manager import FeedbackManager, create_feedback_manager
+from src.rag.weaviate_integration import close_shared_clients
 
 class TestEndToEndFlow(unittest.TestCase):
     """
     Testes end-to-end para a aplicação Streamlit
     """
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """
-        Configuração inicial para os testes
+        Configuração compartilhada por todos os testes da classe
         """
         # Criar diretório temporário para testes
-        self.temp_dir = tempfile.mkdtemp()
-        self.feedback_dir = os.path.join(self.temp_dir, 'feedback')
-        os.makedirs(self.feedback_dir, exist_ok=True)
+        cls.temp_dir = tempfile.mkdtemp()
         
         # Definir caminhos para arquivos de teste
-        self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.test_dir = os.path.join(self.base_dir, 'tests')
-        self.data_dir = os.path.join(self.temp_dir, 'data')
-        os.makedirs(self.data_dir, exist_ok=True)
+        cls.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        cls.test_dir = os.path.join(cls.base_dir, 'tests')
+        cls.data_dir = os.path.join(cls.temp_dir, 'data')
+        os.makedirs(cls.data_dir, exist_ok=True)
+        
+        # Criar diretrizes de teste
+        cls.diretrizes_path = os.path.join(cls.data_dir, 'test_diretrizes.md')
+        with open(cls.diretrizes_path, 'w', encoding='utf-8') as f:
+            f.write("# Diretrizes de teste\n\nEstas são diretrizes para teste.")
+        
+        # Mocks do Weaviate e da OpenAI, criados uma vez e reiniciados a cada teste
+        # (o cliente OpenAI expõe chat como cached_property, que o autospec não enxerga)
+        cls.patchers = [
+            patch('src.rag.weaviate_integration.weaviate', autospec=True),
+            patch('ui.rag_connector.OpenAI')
+        ]
+        cls.mock_weaviate, cls.mock_openai = [patcher.start() for patcher in cls.patchers]
+    
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Limpeza após todos os testes da classe
+        """
+        for patcher in cls.patchers:
+            patcher.stop()
+        
+        # Remover diretório temporário
+        shutil.rmtree(cls.temp_dir)
+    
+    def setUp(self):
+        """
+        Configuração inicial para os testes
+        """
+        self.mock_weaviate.reset_mock(return_value=True, side_effect=True)
+        self.mock_openai.reset_mock(return_value=True, side_effect=True)
+        
+        # Descartar clientes Weaviate compartilhados criados por outros testes
+        self.addCleanup(close_shared_clients)
+        
+        # Diretório de feedback próprio de cada teste
+        self.feedback_dir = os.path.join(self.temp_dir, 'feedback', self._testMethodName)
+        os.makedirs(self.feedback_dir, exist_ok=True)
         
         # Configurar arquivo de feedback para testes
         self.test_feedback_file = os.path.join(self.feedback_dir, 'test_feedback.json')
@@ -55,6 +94,7 @@ class TestEndToEndFlow(unittest.TestCase):
         
         # Inicializar gerenciador de feedback para testes
         self.feedback_manager = FeedbackManager(self.feedback_dir)
+        self.addCleanup(self.feedback_manager.close)
         
         # Configurar dados de teste
         self.test_query = "Quais são os principais desafios na personalização da Home?"
@@ -67,13 +107,6 @@ class TestEndToEndFlow(unittest.TestCase):
             }
         ]
     
-    def tearDown(self):
-        """
-        Limpeza após os testes
-        """
-        # Remover diretório temporário
-        shutil.rmtree(self.temp_dir)
-    
     def test_feedback_manager(self):
         """
         Testa o fluxo de feedback do usuário
@@ -112,58 +145,55 @@ class TestEndToEndFlow(unittest.TestCase):
         
         logger.info("Teste de gerenciador de feedback concluído com sucesso")
     
-    @patch('ui.rag_connector.weaviate')
-    @patch('ui.rag_connector.OpenAI')
-    def test_rag_connector(self, mock_openai, mock_weaviate):
+    def _make_rag_mocks(self):
         """
-        Testa o fluxo do conector RAG
+        Configura os mocks do Weaviate e da OpenAI usados pelo conector RAG
         """
-        logger.info("Testando conector RAG...")
-        
         # Configurar mocks
         mock_client = MagicMock()
-        mock_weaviate.connect_to_weaviate_cloud.return_value = mock_client
+        self.mock_weaviate.connect_to_custom.return_value = mock_client
         mock_client.is_ready.return_value = True
         
         mock_collection = MagicMock()
         mock_client.collections.get.return_value = mock_collection
         
-        mock_query = MagicMock()
-        mock_collection.query.near_text.return_value = mock_query
-        
-        # Configurar resultados simulados
-        mock_result = MagicMock()
-        mock_result.properties = {
+        # Configurar resultados simulados (objetos simples: só há leitura de atributos)
+        mock_result = SimpleNamespace(properties={
             "content": "Conteúdo de teste",
             "filename": "arquivo_teste.pdf",
             "chunk_id": 1,
             "tipo": "Discovery"
-        }
-        mock_query.objects = [mock_result]
+        })
+        mock_collection.query.hybrid.return_value = SimpleNamespace(objects=[mock_result])
         
         # Configurar mock do OpenAI
         mock_openai_instance = MagicMock()
-        mock_openai.return_value = mock_openai_instance
+        self.mock_openai.return_value = mock_openai_instance
+        
+        # Embedding da consulta, gerado no cliente (a coleção não tem vectorizer)
+        mock_openai_instance.embeddings.create.return_value = SimpleNamespace(data=[SimpleNamespace(embedding=[0.1, 0.2, 0.3])])
         
-        mock_response = MagicMock()
-        mock_choice = MagicMock()
-        mock_message = MagicMock()
-        mock_message.content = "Resposta gerada pelo GPT-4o"
-        mock_choice.message = mock_message
-        mock_response.choices = [mock_choice]
+        mock_message = SimpleNamespace(content="Resposta gerada pelo GPT-4o")
+        mock_response = SimpleNamespace(choices=[SimpleNamespace(message=mock_message)])
         
         mock_openai_instance.chat.completions.create.return_value = mock_response
         
-        # Criar conector RAG com diretrizes de teste
-        diretrizes_path = os.path.join(self.data_dir, 'test_diretrizes.md')
-        with open(diretrizes_path, 'w', encoding='utf-8') as f:
-            f.write("# Diretrizes de teste\n\nEstas são diretrizes para teste.")
+        return mock_collection, mock_openai_instance
+    
+    def test_rag_connector(self):
+        """
+        Testa o fluxo do conector RAG
+        """
+        logger.info("Testando conector RAG...")
+        
+        mock_collection, mock_openai_instance = self._make_rag_mocks()
         
+        # Criar conector RAG com diretrizes de teste
         rag_connector = RAGConnector(
             "https://test-weaviate-url.com",
             "test-api-key",
             "test-openai-key",
-            diretrizes_path
+            self.diretrizes_path
         )
         
         # Testar conexão com Weaviate
@@ -174,6 +204,15 @@ class TestEndToEndFlow(unittest.TestCase):
         results = rag_connector.search_documents("teste")
         self.assertEqual(len(results), 1, "Número incorreto de resultados de busca")
         
+        # A busca envia o vetor da consulta, gerado com o modelo da indexação
+        embedding_kwargs = mock_openai_instance.embeddings.create.call_args.kwargs
+        self.assertEqual(embedding_kwargs["model"], "text-embedding-3-small")
+        self.assertEqual(embedding_kwargs["input"], ["teste"])
+        search_kwargs = mock_collection.query.hybrid.call_args.kwargs
+        self.assertEqual(search_kwargs["query"], "teste")
+        self.assertEqual(search_kwargs["vector"], [0.1, 0.2, 0.3])
+        mock_collection.query.near_text.assert_not_called()
+        
         # Testar geração de resposta
         response = rag_connector.generate_response("teste", results)
         self.assertEqual(response, "Resposta gerada pelo GPT-4o", "Resposta gerada incorretamente")
@@ -0,0 +1,196 @@
+"""
+Testes unitários do gerenciador de feedback.
+
+Cobrem a migração do arquivo JSON antigo, os contadores persistidos, a rotação
+do arquivo ativo, a leitura parcial (limit/tail), a exportação em CSV e a
+gravação em segundo plano.
+"""
+
+import os
+import sys
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adicionar diretório src ao path para importar módulos
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from ui import feedback_manager
+from ui.feedback_manager import FeedbackManager
+
+class TestFeedbackManager(unittest.TestCase):
+    """Testes para o gerenciador de feedback."""
+    
+    def setUp(self):
+        """Cria um diretório de feedback temporário para cada teste."""
+        self.feedback_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.feedback_dir, ignore_errors=True)
+    
+    def _manager(self, **kwargs):
+        """Cria um gerenciador no diretório temporário, encerrado ao final do teste."""
+        manager = FeedbackManager(self.feedback_dir, **kwargs)
+        self.addCleanup(manager.close)
+        return manager
+    
+    def _save(self, manager, count, start=0):
+        """Salva `count` feedbacks numerados, alternando útil/não útil."""
+        for i in range(start, start + count):
+            self.assertTrue(manager.save_feedback(f"consulta {i}", "resposta", [{"id": i}], i % 2 == 0, "ok" if i % 3 == 0 else ""))
+    
+    def _read_log(self):
+        """Lê as linhas do arquivo de feedback ativo."""
+        with open(os.path.join(self.feedback_dir, 'user_feedback.jsonl'), encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    
+    def test_legacy_migration(self):
+        """Testa a conversão do arquivo JSON antigo para JSON lines."""
+        legacy = [
+            {"timestamp": "2024-05-01T10:20:30.123456", "query": "a", "is_helpful": True, "comments": ""},
+            {"timestamp": "2024-05-02T08:00:00", "query": "b", "is_helpful": False, "comments": "ruim"}
+        ]
+        legacy_file = os.path.join(self.feedback_dir, 'user_feedback.json')
+        with open(legacy_file, 'w', encoding='utf-8') as f:
+            json.dump(legacy, f)
+        
+        manager = self._manager()
+        
+        self.assertTrue(os.path.exists(legacy_file + '.bak'))
+        self.assertFalse(os.path.exists(legacy_file))
+        records = self._read_log()
+        self.assertEqual([r["query"] for r in records], ["a", "b"])
+        # Horários convertidos para UTC, com precisão de segundos
+        for record in records:
+            self.assertTrue(record["timestamp"].endswith("+00:00"))
+            self.assertNotIn(".", record["timestamp"])
+        self.assertEqual(manager.get_feedback_stats()["total"], 2)
+    
+    def test_corrupt_legacy_file(self):
+        """Testa que um arquivo antigo ilegível não impede a inicialização."""
+        legacy_file = os.path.join(self.feedback_dir, 'user_feedback.json')
+        with open(legacy_file, 'w', encoding='utf-8') as f:
+            f.write('[{"query": ')
+        
+        manager = self._manager()
+        
+        self.assertTrue(os.path.exists(legacy_file + '.bak'))
+        self.assertEqual(manager.get_all_feedback(), [])
+        self.assertEqual(manager.get_feedback_stats()["total"], 0)
+    
+    def test_stats_persisted_and_rebuilt(self):
+        """Testa os contadores gravados em stats.json e sua reconstrução."""
+        manager = self._manager()
+        self._save(manager, 6)
+        self.assertTrue(manager._flush())
+        expected = manager.get_feedback_stats()
+        self.assertEqual(expected["total"], 6)
+        self.assertEqual(expected["helpful_count"], 3)
+        self.assertEqual(expected["with_comments_count"], 2)
+        
+        # Contadores lidos do arquivo
+        self.assertEqual(self._manager().get_feedback_stats(), expected)
+        
+        # Contadores reconstruídos a partir do log
+        os.remove(os.path.join(self.feedback_dir, 'stats.json'))
+        self.assertEqual(self._manager().get_feedback_stats(), expected)
+        
+        # Contadores desatualizados (log alterado fora do gerenciador)
+        with open(os.path.join(self.feedback_dir, 'user_feedback.jsonl'), 'ab') as f:
+            f.write(b'{"is_helpful": true, "comments": ""}\n')
+        self.assertEqual(self._manager().get_feedback_stats()["total"], 7)
+    
+    def test_rotation(self):
+        """Testa o arquivamento do arquivo ativo ao ultrapassar max_bytes."""
+        manager = self._manager(max_bytes=300)
+        for i in range(5):
+            self._save(manager, 1, start=i)
+            self.assertTrue(manager._flush())
+        
+        archived = [name for name in os.listdir(self.feedback_dir) if name.startswith('user_feedback.') and name.count('.') == 2]
+        self.assertTrue(archived)
+        self.assertEqual([f["query"] for f in manager.get_all_feedback()], [f"consulta {i}" for i in range(5)])
+        
+        # Contadores reconstruídos somando arquivados e ativo
+        os.remove(os.path.join(self.feedback_dir, 'stats.json'))
+        self.assertEqual(self._manager(max_bytes=300).get_feedback_stats()["total"], 5)
+    
+    def test_get_all_feedback_limit_and_tail(self):
+        """Testa a leitura dos primeiros e dos últimos feedbacks."""
+        manager = self._manager(max_bytes=300)
+        for i in range(6):
+            self._save(manager, 1, start=i)
+            manager._flush()
+        
+        queries = lambda feedbacks: [f["query"] for f in feedbacks]
+        self.assertEqual(queries(manager.get_all_feedback(limit=2)), ["consulta 0", "consulta 1"])
+        self.assertEqual(queries(manager.get_all_feedback(tail=3)), ["consulta 3", "consulta 4", "consulta 5"])
+        self.assertEqual(len(manager.get_all_feedback(tail=100)), 6)
+    
+    def test_export_csv_sharded(self):
+        """Testa a exportação em CSV, em um arquivo e dividida em partes."""
+        manager = self._manager()
+        self._save(manager, 10)
+        output_path = os.path.join(self.feedback_dir, 'export.csv')
+        
+        single = manager.export_feedback_to_csv(output_path)
+        with open(single, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(json.loads(rows[0]["sources"]), [{"id": 0}])
+        
+        parts = manager.export_feedback_to_csv(output_path, shards=3)
+        self.assertGreater(len(parts), 1)
+        sharded_rows = []
+        for path in parts:
+            with open(path, newline='', encoding='utf-8') as f:
+                sharded_rows.extend(csv.DictReader(f))
+        self.assertEqual([r["query"] for r in sharded_rows], [r["query"] for r in rows])
+    
+    def test_unserializable_feedback_rejected(self):
+        """Testa que um feedback não serializável é recusado sem bloquear os seguintes."""
+        manager = self._manager()
+        self.assertFalse(manager.save_feedback("consulta", "resposta", [object()], True))
+        self._save(manager, 2)
+        
+        self.assertTrue(manager._flush())
+        self.assertEqual(len(self._read_log()), 2)
+        self.assertEqual(manager.get_feedback_stats()["total"], 2)
+    
+    def test_failed_writes_set_aside(self):
+        """Testa que um lote que não pode ser gravado é separado após as tentativas."""
+        manager = self._manager()
+        
+        with patch.object(feedback_manager, 'WRITE_MAX_ATTEMPTS', 2), \
+                patch.object(FeedbackManager, '_write_batch', side_effect=lambda feedbacks: feedbacks):
+            self._save(manager, 3)
+            # Duas tentativas de gravação, cada uma pedida por _flush
+            manager._flush()
+            manager._flush()
+        
+        failed_file = os.path.join(self.feedback_dir, feedback_manager.FAILED_FEEDBACK_FILE)
+        with open(failed_file, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 3)
+        self.assertEqual(manager.get_feedback_stats()["total"], 0)
+        
+        # Gravações seguintes não são afetadas
+        self._save(manager, 1)
+        self.assertTrue(manager._flush())
+        self.assertEqual(len(self._read_log()), 1)
+    
+    def test_close(self):
+        """Testa que close grava os pendentes, encerra a thread e recusa novos feedbacks."""
+        manager = self._manager()
+        self._save(manager, 3)
+        
+        self.assertTrue(manager.close())
+        self.assertFalse(manager._writer.is_alive())
+        self.assertEqual(len(self._read_log()), 3)
+        
+        self.assertFalse(manager.save_feedback("consulta", "resposta", [], True))
+        self.assertTrue(manager.close())
+        self.assertEqual(self._read_log()[-1]["query"], "consulta 2")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,19 +3,68 @@ Módulo para testes do classificador de objetivos.
 
 Este módulo implementa testes unitários para o classificador de objetivos,
 verificando a precisão da classificação em diferentes cenários.
+
+Por padrão a API OpenAI é substituída por um cliente de embeddings
+determinístico. Os mesmos testes rodam contra a API real com
+OPENAI_INTEGRATION_TESTS=1 e OPENAI_API_KEY definidos; com OPENAI_CACHE=1 as
+respostas de embeddings ficam em cache em disco e as execuções seguintes não
+chamam a API (OPENAI_CACHE_REFRESH=1 renova o cache).
 """
+import re
 import unittest
 import os
+from types import SimpleNamespace
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
 from src.context.objective_classifier import ObjectiveClassifier
 
+# Termos que caracterizam cada objetivo, na ordem das dimensões dos embeddings
+# simulados (após a dimensão constante)
+_FAKE_EMBEDDING_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"quais são|quais foram|o que descobrimos|o que sabemos|que informações|que dados|quais funcionalidades",
+    r"hipótese|acreditamos|suposição|suspeitamos|teoria|confirma",
+    r"insights|padrões|dizem|aprender|conclusões|aprendizados|revelam",
+))
+
+def _fake_embedding(model, input):
+    """
+    Simula embeddings.create: o vetor tem uma dimensão constante e uma
+    contagem de termos por objetivo, de modo que perguntas sem termos
+    característicos ficam equidistantes dos três objetivos.
+    """
+    embedding = [1.0] + [float(len(pattern.findall(input))) for pattern in _FAKE_EMBEDDING_PATTERNS]
+    return SimpleNamespace(data=[SimpleNamespace(embedding=embedding)])
+
+def _fake_openai_client():
+    """Cliente OpenAI simulado, com apenas embeddings.create."""
+    return SimpleNamespace(embeddings=SimpleNamespace(create=_fake_embedding))
+
 class TestObjectiveClassifier(unittest.TestCase):
     """Testes para o classificador de objetivos."""
     
-    def setUp(self):
+    # Se True, usa a API OpenAI real em vez do cliente simulado
+    use_live_api = False
+    
+    @classmethod
+    def setUpClass(cls):
         """Configuração inicial para os testes."""
-        # Usar uma chave de API de teste ou mock
-        self.api_key = os.environ.get("OPENAI_API_KEY")
-        self.classifier = ObjectiveClassifier(api_key=self.api_key)
+        # Um único classificador para todos os testes: a construção cria o
+        # cliente OpenAI e pré-computa os embeddings dos exemplos, e os testes
+        # não alteram o estado do classificador. Os padrões diretos ficam
+        # desativados para que as perguntas passem pelos embeddings; eles são
+        # testados à parte em test_direct_pattern_classification
+        if cls.use_live_api:
+            cls.api_key = os.environ.get("OPENAI_API_KEY")
+            cls.classifier = ObjectiveClassifier(api_key=cls.api_key, use_direct_patterns=False)
+        else:
+            cls.api_key = "test-api-key"
+            with patch('src.context.objective_classifier.create_safe_openai_client', return_value=_fake_openai_client()):
+                cls.classifier = ObjectiveClassifier(api_key=cls.api_key, use_direct_patterns=False)
+    
+    def _classify_all(self, questions):
+        """Classifica as perguntas em paralelo, já que o tempo é dominado pelas chamadas à API."""
+        with ThreadPoolExecutor(max_workers=len(questions)) as executor:
+            return list(executor.map(self.classifier.classify_question, questions))
     
     def test_explore_classification(self):
         """Testa a classificação de perguntas de exploração."""
@@ -25,10 +74,10 @@ class TestObjectiveClassifier(unittest.TestCase):
             "Que informações temos sobre o tempo médio que os usuários passam na home do app?"
         ]
         
-        for question in questions:
-            objective, confidence, _ = self.classifier.classify_question(question)
-            self.assertEqual(objective, ObjectiveClassifier.OBJECTIVE_EXPLORE)
-            self.assertGreaterEqual(confidence, 0.5)
+        for question, (objective, confidence, _) in zip(questions, self._classify_all(questions)):
+            with self.subTest(question=question):
+                self.assertEqual(objective, ObjectiveClassifier.OBJECTIVE_EXPLORE)
+                self.assertGreaterEqual(confidence, 0.5)
     
     def test_validate_classification(self):
         """Testa a classificação de perguntas de validação de hipótese."""
@@ -38,10 +87,10 @@ class TestObjectiveClassifier(unittest.TestCase):
             "Temos a hipótese que destacar ações recentes na home tem melhor conversão. Isso se confirma?"
         ]
         
-        for question in questions:
-            objective, confidence, _ = self.classifier.classify_question(question)
-            self.assertEqual(objective, ObjectiveClassifier.OBJECTIVE_VALIDATE)
-            self.assertGreaterEqual(confidence, 0.5)
+        for question, (objective, confidence, _) in zip(questions, self._classify_all(questions)):
+            with self.subTest(question=question):
+                self.assertEqual(objective, ObjectiveClassifier.OBJECTIVE_VALIDATE)
+                self.assertGreaterEqual(confidence, 0.5)
     
     def test_insight_classification(self):
         """Testa a classificação de perguntas de pedido de insight."""
@@ -51,10 +100,10 @@ class TestObjectiveClassifier(unittest.TestCase):
             "Que padrões emergentes podemos identificar no comportamento dos usuários na home do app?"
         ]
         
-        for question in questions:
-            objective, confidence, _ = self.classifier.classify_question(question)
-            self.assertEqual(objective, ObjectiveClassifier.OBJECTIVE_INSIGHT)
-            self.assertGreaterEqual(confidence, 0.5)
+        for question, (objective, confidence, _) in zip(questions, self._classify_all(questions)):
+            with self.subTest(question=question):
+                self.assertEqual(objective, ObjectiveClassifier.OBJECTIVE_INSIGHT)
+                self.assertGreaterEqual(confidence, 0.5)
     
     def test_ambiguous_questions(self):
         """Testa a classificação de perguntas ambíguas."""
@@ -64,10 +113,41 @@ class TestObjectiveClassifier(unittest.TestCase):
             "A home do app está funcionando bem?"
         ]
         
-        for question in questions:
-            objective, confidence, _ = self.classifier.classify_question(question)
-            # Não testamos qual objetivo foi escolhido, apenas que a confiança é menor
-            self.assertLessEqual(confidence, 0.8)
+        for question, (objective, confidence, _) in zip(questions, self._classify_all(questions)):
+            with self.subTest(question=question):
+                # Não testamos qual objetivo foi escolhido, apenas que a confiança é menor
+                self.assertLessEqual(confidence, 0.8)
+    
+    def test_direct_pattern_classification(self):
+        """Testa que perguntas reconhecidas pelos padrões diretos não chamam a API."""
+        client = _fake_openai_client()
+        with patch('src.context.objective_classifier.create_safe_openai_client', return_value=client):
+            classifier = ObjectiveClassifier(api_key="test-api-key")
+        calls = []
+        client.embeddings.create = lambda **kwargs: calls.append(kwargs)
+        
+        questions = {
+            "O que sabemos sobre o uso do extrato pelos lojistas?": ObjectiveClassifier.OBJECTIVE_EXPLORE,
+            "A hipótese de que o onboarding é longo demais procede?": ObjectiveClassifier.OBJECTIVE_VALIDATE,
+            "Quais padrões aparecem nas reclamações sobre o checkout?": ObjectiveClassifier.OBJECTIVE_INSIGHT
+        }
+        
+        for question, expected in questions.items():
+            with self.subTest(question=question):
+                objective, confidence, scores = classifier.classify_question(question)
+                self.assertEqual(objective, expected)
+                self.assertGreaterEqual(confidence, 0.5)
+                self.assertAlmostEqual(sum(scores.values()), 1.0)
+        self.assertEqual(calls, [])
+        
+        # Termos apenas parecidos com os dos padrões não são reconhecidos
+        for question in [
+            "Precisamos confirmar o prazo de entrega do relatório",
+            "A confirmação do pagamento aparece na home?",
+            "Como está a home do app?"
+        ]:
+            with self.subTest(question=question):
+                self.assertIsNone(classifier._classify_with_patterns(question))
     
     def test_confidence_threshold(self):
         """Testa o limiar de confiança para aceitação automática."""
@@ -106,5 +186,14 @@ class TestObjectiveClassifier(unittest.TestCase):
             self.assertIsNotNone(description)
             self.assertNotEqual(description, "Objetivo desconhecido")
 
+@unittest.skipUnless(
+    os.environ.get("OPENAI_INTEGRATION_TESTS") == "1" and os.environ.get("OPENAI_API_KEY"),
+    "Testes de integração com a API OpenAI desativados (defina OPENAI_INTEGRATION_TESTS=1)"
+)
+class TestObjectiveClassifierIntegration(TestObjectiveClassifier):
+    """Testes do classificador de objetivos contra a API OpenAI real."""
+    
+    use_live_api = True
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+"""
+Testes unitários da integração com o Weaviate.
+
+O cliente Weaviate e o cliente OpenAI são substituídos por mocks; os testes
+verificam as requisições montadas pelo WeaviateClient.
+"""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from src.rag import weaviate_integration
+from src.rag.weaviate_integration import WeaviateClient, DEFAULT_PROPERTIES, make_properties_builder
+
+class TestPropertiesBuilder(unittest.TestCase):
+    """Testes para a montagem das propriedades dos documentos."""
+    
+    def test_defaults_and_extra_metadata(self):
+        """Testa os valores padrão e o repasse dos demais metadados."""
+        build_properties = make_properties_builder(DEFAULT_PROPERTIES)
+        
+        self.assertEqual(build_properties("texto", {}), {
+            "content": "texto",
+            "tipo": "documento",
+            "filename": "",
+            "file_path": ""
+        })
+        self.assertEqual(build_properties("texto", {"path": "a/b.pdf", "autor": "Ana", "paginas": 3}), {
+            "content": "texto",
+            "tipo": "documento",
+            "filename": "",
+            "file_path": "a/b.pdf",
+            "autor": "Ana",
+            "paginas": 3
+        })
+    
+    def test_properties_outside_schema(self):
+        """Testa que propriedades fora do esquema não recebem valor padrão."""
+        build_properties = make_properties_builder([{"name": "content"}, {"name": "tipo"}])
+        
+        self.assertEqual(build_properties("texto", {"path": "a/b.pdf"}), {
+            "content": "texto",
+            "tipo": "documento",
+            "path": "a/b.pdf"
+        })
+
+class TestWeaviateClient(unittest.TestCase):
+    """Testes para o WeaviateClient."""
+    
+    def setUp(self):
+        """Cria um WeaviateClient conectado a um Weaviate simulado."""
+        patcher = patch.object(weaviate_integration, 'weaviate', autospec=True)
+        self.mock_weaviate = patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        # Descartar o cliente compartilhado criado com o Weaviate simulado
+        self.addCleanup(weaviate_integration.close_shared_clients)
+        
+        self.weaviate_client = MagicMock()
+        self.weaviate_client.is_ready.return_value = True
+        self.mock_weaviate.connect_to_custom.return_value = self.weaviate_client
+        self.collection = self.weaviate_client.collections.get.return_value
+        
+        self.openai_client = MagicMock()
+        self.openai_client.embeddings.create.return_value = SimpleNamespace(data=[SimpleNamespace(embedding=[0.5, 0.25])])
+        
+        self.client = WeaviateClient("http://localhost:8080", openai_api_key="test-openai-key")
+        self.client.openai_client = self.openai_client
+    
+    def test_search_documents_sends_query_vector(self):
+        """Testa que a busca híbrida envia o vetor da consulta gerado no cliente."""
+        self.collection.query.hybrid.return_value = SimpleNamespace(objects=["documento"])
+        
+        self.assertEqual(self.client.search_documents("perfis de usuários"), ["documento"])
+        
+        embedding_kwargs = self.openai_client.embeddings.create.call_args.kwargs
+        self.assertEqual(embedding_kwargs["model"], weaviate_integration.EMBEDDING_MODEL)
+        self.assertEqual(embedding_kwargs["input"], ["perfis de usuários"])
+        search_kwargs = self.collection.query.hybrid.call_args.kwargs
+        self.assertEqual(search_kwargs["query"], "perfis de usuários")
+        self.assertEqual(search_kwargs["vector"], [0.5, 0.25])
+        self.assertEqual(search_kwargs["alpha"], weaviate_integration.HYBRID_ALPHA)
+    
+    def test_shared_client_reused_and_replaced(self):
+        """Testa o reaproveitamento do cliente compartilhado e sua troca quando deixa de responder."""
+        url = "http://localhost:8080"
+        self.assertIs(weaviate_integration.get_shared_client(url), self.weaviate_client)
+        self.assertEqual(self.mock_weaviate.connect_to_custom.call_count, 1)
+        
+        # Dentro do intervalo de verificação, nenhuma requisição extra
+        self.weaviate_client.is_ready.reset_mock()
+        self.assertIs(weaviate_integration.get_shared_client(url), self.weaviate_client)
+        self.weaviate_client.is_ready.assert_not_called()
+        
+        # Cliente invalidado que deixou de responder é substituído, sem ser fechado
+        replacement = MagicMock()
+        replacement.is_ready.return_value = True
+        self.mock_weaviate.connect_to_custom.return_value = replacement
+        self.weaviate_client.is_ready.return_value = False
+        weaviate_integration.invalidate_shared_client(url)
+        self.assertIs(weaviate_integration.get_shared_client(url), replacement)
+        self.weaviate_client.close.assert_not_called()
+        
+        # Ao final do processo, ambos são fechados
+        weaviate_integration.close_shared_clients()
+        self.weaviate_client.close.assert_called_once()
+        replacement.close.assert_called_once()
+
+if __name__ == "__main__":
+    unittest.main()
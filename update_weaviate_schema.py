@@ -1,8 +1,9 @@
-import os
 import logging
-import weaviate
-from weaviate.auth import AuthApiKey
 import json
+import datetime
+from pathlib import Path
+from weaviate.classes.config import Vectorizers
+from weaviate_client import get_client, get_schema
 
 # Configuração de logging
 logging.basicConfig(
@@ -11,58 +12,104 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Diretório das cópias dos documentos feitas antes de recriar a classe
+BACKUP_DIR = Path(__file__).resolve().parent / "data" / "backups"
+
+def _backup_documents(collection):
+    """
+    Copia os documentos da coleção, com seus vetores, para restaurá-los após
+    a recriação da coleção.
+    
+    Args:
+        collection (weaviate.collections.Collection): Coleção de documentos
+        
+    Returns:
+        list: Objetos da coleção (uuid, propriedades e vetor)
+    """
+    return [
+        (obj.uuid, obj.properties, (obj.vector or {}).get("default"))
+        for obj in collection.iterator(include_vector=True)
+    ]
+
+def _json_default(value):
+    """Converte para JSON os valores que o json não serializa (datas, UUIDs)."""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+def _write_backup(backup):
+    """
+    Grava em disco a cópia dos documentos, em JSON lines, para que possam ser
+    restaurados manualmente se a recriação da classe falhar.
+    
+    Args:
+        backup (list): Objetos retornados por _backup_documents
+        
+    Returns:
+        Path: Caminho do arquivo gravado
+    """
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    backup_path = BACKUP_DIR / f"document_backup_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    with open(backup_path, "w", encoding="utf-8") as f:
+        for uuid, properties, vector in backup:
+            f.write(json.dumps({"uuid": uuid, "properties": properties, "vector": vector}, ensure_ascii=False, default=_json_default) + "\n")
+    return backup_path
+
+def _restore_documents(collection, backup):
+    """
+    Reinsere em lote os documentos copiados, mantendo uuids e vetores.
+    
+    Args:
+        collection (weaviate.collections.Collection): Coleção recriada
+        backup (list): Objetos retornados por _backup_documents
+        
+    Returns:
+        int: Número de documentos que falharam na reinserção
+    """
+    with collection.batch.dynamic() as batch:
+        for uuid, properties, vector in backup:
+            batch.add_object(properties=properties, uuid=uuid, vector=vector)
+    return len(collection.batch.failed_objects)
+
 def update_weaviate_schema():
     """
     Script para atualizar o schema do Weaviate para usar vectorizer 'none'
     """
     try:
-        # Configurar cliente Weaviate
-        weaviate_url = os.getenv("WEAVIATE_URL", "xoplne4asfshde3fsprroq.c0.us-west3.gcp.weaviate.cloud")
-        weaviate_api_key = os.getenv("WEAVIATE_API_KEY", "8ohYdBTciU1n6zTwA15nnsZYAA1I4S1nI17s")
-        
-        # Garantir que a URL tenha o prefixo https://
-        if not weaviate_url.startswith("http://") and not weaviate_url.startswith("https://"):
-            weaviate_url = f"https://{weaviate_url}"
-        
-        # Criar conexão usando a API v3 com autenticação correta
-        auth_config = None
-        if weaviate_api_key:
-            auth_config = AuthApiKey(api_key=weaviate_api_key)
-            
-        client = weaviate.Client(
-            url=weaviate_url,
-            auth_client_secret=auth_config
-        )
+        # Cliente Weaviate compartilhado pelos scripts
+        client = get_client()
         
         # Verificar se o cliente está conectado
         if not client.is_ready():
             logger.error("Não foi possível conectar ao Weaviate")
             return False
         
-        # Verificar se a classe Document existe
-        schema = client.schema.get()
-        document_class = None
-        for class_obj in schema.get("classes", []):
-            if class_obj.get("class") == "Document":
-                document_class = class_obj
-                break
+        # Verificar se a classe Document existe, buscando apenas a classe
+        document_class = get_schema("Document")
         
         if not document_class:
             logger.error("Classe Document não encontrada no schema")
             return False
         
         # Verificar o vectorizer atual
-        current_vectorizer = document_class.get("vectorizer")
+        current_vectorizer = document_class.vectorizer
         logger.info(f"Vectorizer atual: {current_vectorizer}")
         
         # Se o vectorizer já for 'none', não é necessário atualizar
-        if current_vectorizer == "none":
+        if current_vectorizer == Vectorizers.NONE:
             logger.info("Vectorizer já está configurado como 'none'")
             return True
         
+        # O vectorizer não pode ser alterado no schema existente: copiar os
+        # documentos para não perdê-los ao recriar a classe
+        backup = _backup_documents(client.collections.get("Document"))
+        backup_path = _write_backup(backup)
+        logger.info(f"{len(backup)} documentos copiados para {backup_path} antes da recriação da classe")
+        
         # Deletar a classe Document para recriá-la com vectorizer 'none'
         logger.info("Deletando classe Document para recriá-la com vectorizer 'none'")
-        client.schema.delete_class("Document")
+        client.collections.delete("Document")
+        get_schema.cache_clear()
         
         # Definir o schema da classe Document com vectorizer 'none'
         document_class_schema = {
@@ -113,16 +160,29 @@ def update_weaviate_schema():
             ]
         }
         
-        # Criar a classe Document com o novo schema
-        client.schema.create_class(document_class_schema)
-        logger.info("Classe Document recriada com vectorizer 'none'")
+        try:
+            # Criar a classe Document com o novo schema
+            collection = client.collections.create_from_dict(document_class_schema)
+            get_schema.cache_clear()
+            logger.info("Classe Document recriada com vectorizer 'none'")
+            
+            # Restaurar os documentos copiados, com os vetores já calculados
+            failed = _restore_documents(collection, backup) if backup else 0
+        except Exception as e:
+            get_schema.cache_clear()
+            logger.error(f"Erro ao recriar a classe Document: {str(e)}. Documentos preservados em {backup_path}")
+            return False
+            
+        if failed:
+            logger.error(f"{failed} de {len(backup)} documentos não foram restaurados. Documentos preservados em {backup_path}")
+            return False
+        logger.info(f"{len(backup)} documentos restaurados")
         
         # Verificar se a classe foi criada corretamente
-        schema = client.schema.get()
-        for class_obj in schema.get("classes", []):
-            if class_obj.get("class") == "Document":
-                logger.info(f"Classe Document criada com vectorizer: {class_obj.get('vectorizer')}")
-                return True
+        document_class = get_schema("Document")
+        if document_class:
+            logger.info(f"Classe Document criada com vectorizer: {document_class.vectorizer}")
+            return True
         
         logger.error("Falha ao verificar a criação da classe Document")
         return False
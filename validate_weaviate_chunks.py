@@ -1,8 +1,14 @@
-import os
 import logging
-import weaviate
-from weaviate.auth import AuthApiKey
 import json
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from weaviate_client import get_client, get_schema
+
+# orjson é bem mais rápido que o json da biblioteca padrão; usar se disponível
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configuração de logging
 logging.basicConfig(
@@ -11,28 +17,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Propriedades retornadas pelas buscas de teste
+DOCUMENT_PROPERTIES = ["title", "file_name"]
+
+def _bm25_documents(collection, query, limit):
+    """Busca BM25 em content e title via gRPC, retornando as propriedades dos documentos."""
+    response = collection.query.bm25(
+        query=query,
+        query_properties=["content", "title"],
+        limit=limit,
+        return_properties=DOCUMENT_PROPERTIES
+    )
+    return [obj.properties for obj in response.objects]
+
+def _run_queries(client, test_queries, limit=5):
+    """
+    Conta os documentos e executa as buscas por palavras-chave em paralelo.
+    
+    Args:
+        client (weaviate.WeaviateClient): Cliente Weaviate
+        test_queries (list): Textos das consultas de teste
+        limit (int): Número máximo de documentos por consulta
+        
+    Returns:
+        tuple: (total de documentos, resultados por consulta)
+    """
+    collection = client.collections.get("Document")
+    
+    # O tempo total passa a ser o da consulta mais lenta, e não a soma de todas
+    with ThreadPoolExecutor(max_workers=len(test_queries) + 1) as executor:
+        count_future = executor.submit(lambda: collection.aggregate.over_all(total_count=True).total_count)
+        futures = [executor.submit(_bm25_documents, collection, query, limit) for query in test_queries]
+        
+        try:
+            doc_count = count_future.result()
+            logger.info(f"Total de documentos indexados: {doc_count}")
+        except Exception as e:
+            logger.error(f"Erro ao contar documentos: {str(e)}")
+            doc_count = "desconhecido"
+            
+        results = {}
+        for query, future in zip(test_queries, futures):
+            try:
+                docs = future.result()
+            except Exception as e:
+                logger.error(f"Erro na consulta '{query}': {str(e)}")
+                results[query] = {"error": str(e)}
+                continue
+                
+            logger.info(f"Consulta '{query}' retornou {len(docs)} documentos")
+            for i, doc in enumerate(docs[:3]):
+                logger.info(f"  {i+1}. {doc.get('title')}")
+                
+            results[query] = {
+                "count": len(docs),
+                "titles": [doc.get("title") for doc in docs[:3]]
+            }
+            
+    return doc_count, results
+
 def validate_weaviate_chunks():
     """
     Script para validar os chunks indexados no Weaviate e testar buscas
     """
     try:
-        # Configurar cliente Weaviate
-        weaviate_url = os.getenv("WEAVIATE_URL", "xoplne4asfshde3fsprroq.c0.us-west3.gcp.weaviate.cloud")
-        weaviate_api_key = os.getenv("WEAVIATE_API_KEY", "8ohYdBTciU1n6zTwA15nnsZYAA1I4S1nI17s")
-        
-        # Garantir que a URL tenha o prefixo https://
-        if not weaviate_url.startswith("http://") and not weaviate_url.startswith("https://"):
-            weaviate_url = f"https://{weaviate_url}"
-        
-        # Criar conexão usando a API v3 com autenticação correta
-        auth_config = None
-        if weaviate_api_key:
-            auth_config = AuthApiKey(api_key=weaviate_api_key)
-            
-        client = weaviate.Client(
-            url=weaviate_url,
-            auth_client_secret=auth_config
-        )
+        # Cliente Weaviate compartilhado pelos scripts
+        client = get_client()
         
         # Verificar se o cliente está conectado
         if not client.is_ready():
@@ -40,30 +90,16 @@ def validate_weaviate_chunks():
             return False
         
         # Verificar schema
-        schema = client.schema.get()
-        document_class = None
-        for class_obj in schema.get("classes", []):
-            if class_obj.get("class") == "Document":
-                document_class = class_obj
-                break
+        document_class = get_schema("Document")
         
         if not document_class:
             logger.error("Classe Document não encontrada no schema")
             return False
         
         # Verificar o vectorizer atual
-        current_vectorizer = document_class.get("vectorizer")
+        current_vectorizer = document_class.vectorizer
         logger.info(f"Vectorizer atual: {current_vectorizer}")
         
-        # Contar documentos indexados
-        try:
-            count_result = client.query.aggregate("Document").with_meta_count().do()
-            doc_count = count_result.get("data", {}).get("Aggregate", {}).get("Document", [{}])[0].get("meta", {}).get("count")
-            logger.info(f"Total de documentos indexados: {doc_count}")
-        except Exception as e:
-            logger.error(f"Erro ao contar documentos: {str(e)}")
-            doc_count = "desconhecido"
-        
         # Testar busca por palavras-chave
         logger.info("Testando busca por palavras-chave...")
         
@@ -76,58 +112,23 @@ def validate_weaviate_chunks():
             "stone e ton"
         ]
         
-        results = {}
-        
-        for query in test_queries:
-            logger.info(f"Testando consulta: '{query}'")
-            
-            try:
-                # Busca por palavras-chave (where filter)
-                where_filter = {
-                    "operator": "Or",
-                    "operands": [
-                        {
-                            "path": ["content"],
-                            "operator": "Like",
-                            "valueText": f"*{query}*"
-                        },
-                        {
-                            "path": ["title"],
-                            "operator": "Like",
-                            "valueText": f"*{query}*"
-                        }
-                    ]
-                }
-                
-                where_results = client.query.get(
-                    "Document", 
-                    ["content", "title", "file_name"]
-                ).with_where(where_filter).with_limit(5).do()
-                
-                docs = where_results.get("data", {}).get("Get", {}).get("Document", [])
-                
-                results[query] = {
-                    "count": len(docs),
-                    "titles": [doc.get("title") for doc in docs[:3]]
-                }
-                
-                logger.info(f"Consulta '{query}' retornou {len(docs)} documentos")
-                for i, doc in enumerate(docs[:3]):
-                    logger.info(f"  {i+1}. {doc.get('title')}")
-                    
-            except Exception as e:
-                logger.error(f"Erro na consulta '{query}': {str(e)}")
-                results[query] = {"error": str(e)}
+        # Contar os documentos indexados e executar as consultas
+        doc_count, results = _run_queries(client, test_queries)
         
         # Salvar resultados em um arquivo
         results_file = "weaviate_validation_results.json"
-        with open(results_file, "w", encoding="utf-8") as f:
-            json.dump({
-                "timestamp": str(datetime.now()),
-                "vectorizer": current_vectorizer,
-                "document_count": doc_count,
-                "test_queries": results
-            }, f, indent=2)
+        payload = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "vectorizer": current_vectorizer,
+            "document_count": doc_count,
+            "test_queries": results
+        }
+        if orjson is not None:
+            with open(results_file, "wb") as f:
+                f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+        else:
+            with open(results_file, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
         
         logger.info(f"Resultados salvos em: {results_file}")
         
@@ -137,5 +138,4 @@ def validate_weaviate_chunks():
         return False
 
 if __name__ == "__main__":
-    from datetime import datetime
     validate_weaviate_chunks()
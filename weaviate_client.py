@@ -0,0 +1,52 @@
+"""
+Cliente Weaviate compartilhado pelos scripts de manutenção.
+
+Os scripts (update_weaviate_schema.py, validate_weaviate_chunks.py) obtêm o
+cliente por get_client(). A conexão vem de src.rag.weaviate_integration.get_shared_client,
+a mesma usada pela aplicação: é criada na primeira chamada, reutilizada quando
+os scripts rodam em sequência no mesmo processo e fechada ao final dele.
+"""
+import functools
+from weaviate.exceptions import UnexpectedStatusCodeError
+from weaviate_config import URL, API_KEY
+from src.rag.weaviate_integration import get_shared_client
+
+def get_client():
+    """
+    Retorna o cliente Weaviate compartilhado, conectando na primeira chamada.
+    Gera RuntimeError se WEAVIATE_API_KEY não estiver definida e
+    ConnectionError se não for possível conectar ao Weaviate.
+    
+    Returns:
+        weaviate.WeaviateClient: Cliente Weaviate
+    """
+    if not API_KEY:
+        raise RuntimeError("A variável de ambiente WEAVIATE_API_KEY não está definida")
+    
+    client = get_shared_client(URL, API_KEY)
+    if client is None:
+        raise ConnectionError(f"Não foi possível conectar ao Weaviate: {URL}")
+    return client
+
+@functools.lru_cache(maxsize=None)
+def get_schema(class_name=None):
+    """
+    Retorna o schema do Weaviate, buscado uma única vez e compartilhado pelos
+    scripts. Deve ser invalidado com get_schema.cache_clear() sempre que o
+    schema for alterado.
+    
+    Args:
+        class_name (str, optional): Coleção a buscar pelo endpoint específico;
+            se não fornecida, retorna a configuração de todas as coleções
+    
+    Returns:
+        dict | CollectionConfig: Configurações por nome de coleção, ou a
+            configuração da coleção; None se a coleção não existir
+    """
+    if class_name is None:
+        return get_client().collections.list_all(simple=False)
+        
+    try:
+        return get_client().collections.export_config(class_name)
+    except UnexpectedStatusCodeError:
+        return None
@@ -0,0 +1,13 @@
+"""
+Configuração de acesso ao Weaviate usada pelos scripts de manutenção,
+resolvida uma única vez na importação.
+"""
+import os
+
+# Endpoint do cluster, sempre com o prefixo https:// (ou http://)
+URL = os.getenv("WEAVIATE_URL", "xoplne4asfshde3fsprroq.c0.us-west3.gcp.weaviate.cloud")
+if not URL.startswith("http://") and not URL.startswith("https://"):
+    URL = f"https://{URL}"
+
+# Chave de API do cluster, obrigatória para os scripts (ver weaviate_client.get_client)
+API_KEY = os.getenv("WEAVIATE_API_KEY")